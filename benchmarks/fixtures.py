@@ -0,0 +1,544 @@
+"""
+Synthetic pages for every plugin parser, shaped after the markup each plugin reads.
+
+Every generator takes the number of items the page should hold and returns the page as bytes,
+so parsers can be measured on small and big pages alike without touching the network.
+None of them is a real page, real pages saved by benchmarks.record are loaded from benchmarks/pages by
+recorded_pages when there are any.
+"""
+import json
+import random
+from itertools import accumulate
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+Fixture = Callable[[int], bytes]
+
+words = ("dragon", "sword", "academy", "hero", "demon", "king", "return", "villainess", "tower", "god",
+         "level", "reincarnated", "slime", "magic", "knight", "princess", "solo", "martial", "peak",
+         "legend", "shadow", "moon", "blade", "emperor", "school", "love", "one", "punch", "attack", "titan")
+
+
+def title(i: int) -> str:
+    rng = random.Random(i)
+    return ' '.join(rng.choice(words) for _ in range(rng.randint(2, 5))).title()
+
+
+def slug(i: int) -> str:
+    return title(i).lower().replace(' ', '-') + f'-{i}'
+
+
+def html(body: str, head: str = '') -> bytes:
+    # Some filler around the interesting part, like a real page has
+    nav = ''.join(f'<li><a href="/genre/{w}">{w}</a></li>' for w in words)
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Bench</title>{head}</head>'
+            f'<body><nav><ul class="menu">{nav}</ul></nav><main>{body}</main>'
+            f'<footer><p>Footer</p></footer></body></html>').encode()
+
+
+def script(body: str, code: str) -> bytes:
+    return html(body, f'<script type="text/javascript">{code}</script>')
+
+
+def join(parts) -> str:
+    return ''.join(parts)
+
+
+# AsuraScans
+
+def asurascans_mangas(n: int) -> bytes:
+    return html('<div class="listupd">' + join(
+        f'<div class="bs"><div class="bsx"><a href="https://asuratoon.com/manga/{slug(i)}/" title="{title(i)}">'
+        f'<div class="limit"><img src="https://asuratoon.com/covers/{i}.jpg"/></div></a></div></div>'
+        for i in range(n)) + '</div>')
+
+
+def asurascans_chapters(n: int) -> bytes:
+    return html('<div id="chapterlist"><ul>' + join(
+        f'<li data-num="{i}"><div class="chbox"><div class="eph-num"><a href="https://asuratoon.com/{slug(0)}-'
+        f'chapter-{i}/"><span class="chapternum">Chapter {i}</span><span class="chapterdate">May 1</span>'
+        f'</a></div></div></li>' for i in range(n, 0, -1)) + '</ul></div>')
+
+
+def asurascans_updates(n: int) -> bytes:
+    return html(join(
+        f'<div class="utao"><div class="uta"><div class="imgu"><a href="https://asuratoon.com/manga/{slug(i)}/">'
+        f'<img src="https://asuratoon.com/covers/{i}.jpg"/></a></div><div class="luf"><ul>'
+        f'<li><a href="https://asuratoon.com/{slug(i)}-chapter-{i + 10}/">Chapter {i + 10}</a></li>'
+        f'<li><a href="https://asuratoon.com/{slug(i)}-chapter-{i + 9}/">Chapter {i + 9}</a></li>'
+        f'</ul></div></div></div>' for i in range(n)))
+
+
+def asurascans_pictures(n: int) -> bytes:
+    return html('<div id="readerarea">' + join(
+        f'<p><img src="https://asuratoon.com/pages/{slug(0)}/{i:03}.jpg" alt=""/></p>'
+        for i in range(n)) + '</div>')
+
+
+# KissManga
+
+def kissmanga_mangas(n: int) -> bytes:
+    return html(join(
+        f'<div class="mainpage-manga"><div class="media-left"><img src="https://kissmanga.org/covers/{i}.jpg"/>'
+        f'</div><div class="media-body"><a href="https://kissmanga.org/manga/{slug(i)}" title="{title(i)}">'
+        f'{title(i)}</a></div></div>' for i in range(n)))
+
+
+def kissmanga_chapters(n: int) -> bytes:
+    return html('<div class="chapter-list"></div><div class="chapter-list">' + join(
+        f'<div class="row"><h4><a href="https://kissmanga.org/chapter/{slug(0)}/chapter-{i}" '
+        f'title="{title(0)} Chapter {i}">Chapter {i}</a></h4></div>' for i in range(n, 0, -1)) + '</div>')
+
+
+def kissmanga_updates(n: int) -> bytes:
+    return html(join(
+        f'<div class="media-body"><a href="https://kissmanga.org/manga/{slug(i)}">{title(i)}</a>'
+        f'<a class="xanh" href="https://kissmanga.org/chapter/{slug(i)}/chapter-{i}">Chapter {i}</a></div>'
+        for i in range(n)))
+
+
+def kissmanga_pictures(n: int) -> bytes:
+    return html('<p id="arraydata" style="display:none">' + ','.join(
+        f'https://kissmanga.org/pages/{i}.jpg' for i in range(n)) + '</p>')
+
+
+# MangaBuddy
+
+def mangabuddy_mangas(n: int) -> bytes:
+    return html(join(
+        f'<div class="book-item"><div class="thumb"><a href="/{slug(i)}" title="{title(i)}">'
+        f'<img data-src="https://thumb.youmadcdn.xyz/{i}.jpg"/></a></div></div>' for i in range(n)))
+
+
+def mangabuddy_chapters(n: int) -> bytes:
+    return html('<ul id="chapter-list">' + join(
+        f'<li><a href="/{slug(0)}/chapter-{i}"><div><strong class="chapter-title">Chapter {i}</strong>'
+        f'</div><time class="chapter-update">1 day ago</time></a></li>' for i in range(n, 0, -1)) + '</ul>')
+
+
+def mangabuddy_updates(n: int) -> bytes:
+    return html('<div class="container__left">' + join(
+        f'<div class="book-item"><div class="thumb"><a href="/{slug(i)}"><img data-src="/{i}.jpg"/></a></div>'
+        f'<div class="chap-item"><a href="/{slug(i)}/chapter-{i}">Chapter {i}</a></div></div>'
+        for i in range(n)) + '</div>')
+
+
+def mangabuddy_pictures(n: int) -> bytes:
+    images = ','.join(f'https://s1.mbbcdn.com/pages/{i}.jpg' for i in range(n))
+    return script('<div id="chapter-images"></div>', f"var chapImages = '{images}'\nvar chapterId = 1;")
+
+
+# MangaDex
+
+def mangadex_mangas(n: int) -> bytes:
+    return json.dumps({'result': 'ok', 'data': [{
+        'id': f'{i:08x}-0000-0000-0000-000000000000', 'type': 'manga',
+        'attributes': {'title': {'en': title(i)}, 'description': {'en': 'Lorem ipsum ' * 20}, 'tags': []},
+        'relationships': [{'id': 'a', 'type': 'author'},
+                          {'id': 'c', 'type': 'cover_art', 'attributes': {'fileName': f'{i}.jpg'}}]}
+        for i in range(n)]}).encode()
+
+
+def mangadex_chapters(n: int) -> bytes:
+    return json.dumps({'result': 'ok', 'data': [{
+        'id': f'{i:08x}-1111-1111-1111-111111111111', 'type': 'chapter',
+        'attributes': {'chapter': str(i), 'title': title(i) if i % 3 else None, 'translatedLanguage': 'en',
+                       'pages': 20},
+        'relationships': [{'id': 'g', 'type': 'scanlation_group'}]}
+        for i in range(n, 0, -1)]}).encode()
+
+
+def mangadex_pictures(n: int) -> bytes:
+    return json.dumps({'result': 'ok', 'baseUrl': 'https://uploads.mangadex.org',
+                       'chapter': {'hash': 'f' * 32, 'data': [f'{i}-{"a" * 64}.png' for i in range(n)]}}).encode()
+
+
+# MangaHasu
+
+def mangahasu_mangas(n: int) -> bytes:
+    # The search answers with a bare list, the parser takes every li on it
+    return ('<ul class="list_manga">' + join(
+        f'<li><a href="https://mangahasu.se/{slug(i)}.html"><img src="https://img.mangahasu.se/{i}.jpg"/></a>'
+        f'<p class="name">{title(i)}</p></li>' for i in range(n)) + '<li>More</li></ul>').encode()
+
+
+def mangahasu_chapters(n: int) -> bytes:
+    return html('<div class="list-chapter"><table><tr><th>Chapter</th><th>Date</th></tr>' + join(
+        f'<tr><td class="name"><a href="https://mangahasu.se/{slug(0)}/chapter-{i}.html">{title(0)} Chapter {i}'
+        f'</a></td><td>Jan 1</td></tr>' for i in range(n, 0, -1)) + '</table></div>')
+
+
+def mangahasu_updates(n: int) -> bytes:
+    return html('<div class="st_content">' + join(
+        f'<div class="info-manga"><a class="name-manga" href="https://mangahasu.se/{slug(i)}.html">{title(i)}</a>'
+        f'<a class="name-chapter" href="https://mangahasu.se/{slug(i)}/chapter-{i}.html">Chapter {i}</a></div>'
+        for i in range(n)) + '</div>')
+
+
+def mangahasu_pictures(n: int) -> bytes:
+    return html('<div class="img">' + join(
+        f'<img src="https://img.mangahasu.se/pages/{i}.jpg"/>' for i in range(n)) + '</div>')
+
+
+# MangaKakalot, Manganato and Manganelo share most of their markup
+
+def reader_pictures(n: int) -> bytes:
+    return html('<div class="container-chapter-reader">' + join(
+        f'<img src="https://v1.mkklcdnv6tempv5.com/img/pages/{i}.jpg" alt="page {i}"/>' for i in range(n)) +
+                '</div>')
+
+
+def mangakakalot_mangas(n: int) -> bytes:
+    return json.dumps([{
+        'name': f'<span style="color: #FF530D;font-weight: bold;">{title(i)}</span>',
+        'story_link': f'https://mangakakalot.com/manga/{slug(i)}',
+        'image': f'https://avt.mkklcdnv6temp.com/{i}.jpg'} for i in range(n)]).encode()
+
+
+def mangakakalot_chapters(n: int) -> bytes:
+    return html('<div class="chapter-list">' + join(
+        f'<div class="row"><span><a href="https://mangakakalot.com/chapter/{slug(0)}/chapter_{i}" '
+        f'title="Chapter {i}">Chapter {i}</a></span><span>1,234</span><span>Jan 1</span></div>'
+        for i in range(n, 0, -1)) + '</div>')
+
+
+def mangakakalot_updates(n: int) -> bytes:
+    return html(join(
+        f'<div class="itemupdate first"><a href="https://mangakakalot.com/manga/{slug(i)}">'
+        f'<img src="/{i}.jpg"/></a><ul><li><a class="sts sts_1" '
+        f'href="https://mangakakalot.com/chapter/{slug(i)}/chapter_{i}">Chapter {i}</a></li></ul></div>'
+        for i in range(n)))
+
+
+def manganato_mangas(n: int) -> bytes:
+    return json.dumps({'searchlist': [{
+        'name': f'<span style="color: #FF530D;font-weight: bold;">{title(i)}</span>',
+        'url_story': f'https://chapmanganato.com/manga-{i}',
+        'image': f'https://avt.mkklcdnv6temp.com/{i}.jpg'} for i in range(n)]}).encode()
+
+
+def manganato_chapters(n: int) -> bytes:
+    return html('<ul class="row-content-chapter">' + join(
+        f'<li class="a-h"><a class="chapter-name text-nowrap" href="https://chapmanganato.com/manga-0/chapter-{i}"'
+        f' title="Chapter {i}">Chapter {i}</a><span class="chapter-view">1K</span></li>'
+        for i in range(n, 0, -1)) + '</ul>')
+
+
+def manganato_updates(n: int) -> bytes:
+    return html(join(
+        f'<div class="content-homepage-item"><a href="https://chapmanganato.com/manga-{i}"><img src="/{i}.jpg"/>'
+        f'</a><div class="content-homepage-item-right"><p class="a-h item-chapter">'
+        f'<a href="https://chapmanganato.com/manga-{i}/chapter-{i}">Chapter {i}</a></p></div></div>'
+        for i in range(n)))
+
+
+def manganelo_mangas(n: int) -> bytes:
+    return html(join(
+        f'<div class="search-story-item"><a href="https://m.manganelo.com/manga-{i}" title="{title(i)}">'
+        f'<img src="https://avt.mkklcdnv6temp.com/{i}.jpg"/></a></div>' for i in range(n)))
+
+
+def manganelo_updates(n: int) -> bytes:
+    return html(join(
+        f'<div class="content-genres-item"><a class="genres-item-img" href="https://m.manganelo.com/manga-{i}">'
+        f'<img src="/{i}.jpg"/></a><a class="genres-item-chap" href="https://m.manganelo.com/chapter/{i}/'
+        f'chapter_{i}">Chapter {i}</a></div>' for i in range(n)))
+
+
+# Mangasee
+
+def mangasee_chapter(i: int) -> dict:
+    return {'Chapter': f'1{i:04}0', 'Type': 'Chapter', 'Date': '2023-01-01 00:00:00', 'ChapterName': None}
+
+
+def mangasee_chapters(n: int) -> bytes:
+    chapters = [mangasee_chapter(i) for i in range(n, 0, -1)]
+    return script('<div ng-app="MainApp"></div>',
+                  f'vm.IndexName = "{title(0).replace(" ", "-")}";\n'
+                  f'vm.Chapters = {json.dumps(chapters)};\nvm.NumSubs = 10;')
+
+
+def mangasee_updates(n: int) -> bytes:
+    latest = [dict(mangasee_chapter(i), IndexName=title(i).replace(' ', '-') + f'-{i}', SeriesName=title(i))
+              for i in range(n)]
+    return script('<div ng-app="MainApp"></div>', f'vm.LatestJSON = {json.dumps(latest)};\nvm.NewSeries = [];')
+
+
+def mangasee_pictures(n: int) -> bytes:
+    chapter = dict(mangasee_chapter(10), Page=str(n), Directory='')
+    return script('<div ng-app="MainApp"></div>',
+                  f'vm.CurChapter = {json.dumps(chapter)};\nvm.CurPathName = "official.lowee.us";\n'
+                  f'vm.IndexName = "{title(0).replace(" ", "-")}";')
+
+
+# Romanized syllables, titles are made of made up words built from them
+syllables = tuple(consonant + vowel for consonant in ('', 'k', 's', 'sh', 't', 'ch', 'n', 'h', 'm', 'y', 'r', 'w',
+                                                      'g', 'j', 'd', 'b', 'p')
+                  for vowel in 'aiueo') + ('n',)
+
+
+def vocabulary(size: int) -> List[str]:
+    """size distinct words, the common english ones first and then made up ones"""
+    rng = random.Random(size)
+    found = dict.fromkeys(words)
+    while len(found) < size:
+        found.setdefault(''.join(rng.choice(syllables) for _ in range(rng.randint(1, 4))))
+    return list(found)[:size]
+
+
+def mangasee_directory(n: int) -> List[dict]:
+    """
+    Documents like the ones in the Mangasee search directory. The vocabulary grows with the directory and word
+    frequencies follow Zipf's law, a few words are in many titles and most words are in a handful.
+    """
+    rng = random.Random(n)
+    vocabulary_words = vocabulary(2 * n + 1000)
+    cum_weights = list(accumulate(1 / rank for rank in range(1, len(vocabulary_words) + 1)))
+
+    def name() -> str:
+        return ' '.join(rng.choices(vocabulary_words, cum_weights=cum_weights, k=rng.randint(1, 6))).title()
+
+    documents = []
+    for i in range(n):
+        series_name = name()
+        documents.append({'i': series_name.replace(' ', '-') + f'-{i}', 's': series_name,
+                          'a': [name() for _ in range(rng.randint(0, 3))]})
+    return documents
+
+
+# MangasIn
+
+def mangasin_mangas(n: int) -> bytes:
+    return json.dumps([{'value': title(i), 'data': slug(i)} for i in range(n)]).encode()
+
+
+def mangasin_chapters(n: int) -> bytes:
+    chapters = [{'number': str(i), 'slug': str(i), 'manga_id': 1, 'name': title(i)} for i in range(n, 0, -1)]
+    return script('<div id="chapters"></div>', f'var mangaId = 1;\nvar chapters = {json.dumps(chapters)};')
+
+
+def mangasin_updates(n: int) -> bytes:
+    return html(join(
+        f'<div class="manga-item"><a href="https://mangas.in/manga/{slug(i)}"><img src="/{i}.jpg"/></a>'
+        f'<a href="https://mangas.in/manga/{slug(i)}">{title(i)}</a><div class="manga-chapter">'
+        f'<a href="https://mangas.in/manga/{slug(i)}/{i}">{i}</a></div></div>' for i in range(n)))
+
+
+def mangasin_pictures(n: int) -> bytes:
+    return html('<div id="all">' + join(
+        f'<img class="img-responsive" data-src="https://mangas.in/uploads/pages/{i}.jpg"/>' for i in range(n)) +
+                '</div>')
+
+
+# Mangatigre
+
+def mangatigre_mangas(n: int) -> bytes:
+    return json.dumps({'result': [{'name': title(i), 'slug': slug(i), 'image': f'{i}.jpg'}
+                                  for i in range(n)]}).encode()
+
+
+def mangatigre_chapters(n: int) -> bytes:
+    return html('<ul class="list-unstyled">' + join(
+        f'<li><a href="https://www.mangatigre.net/manga/{slug(0)}/{i}" title="{i}: {title(i)}">'
+        f'Capítulo {i}</a></li>' for i in range(n, 0, -1)) + '</ul>')
+
+
+def mangatigre_updates(n: int) -> bytes:
+    return html(join(
+        f'<article class="chapter-block"><a href="https://www.mangatigre.net/manga/{slug(i)}">{title(i)}</a>'
+        f'<div class="chapter"><a href="https://www.mangatigre.net/manga/{slug(i)}/{i}">{i}</a></div></article>'
+        for i in range(n)))
+
+
+def mangatigre_pictures(n: int) -> bytes:
+    return html('<div class="display-zone">' + join(
+        f'<img data-src="//i2.mtcdn.xyz/pages/{i}.jpg"/>' for i in range(n)) + '</div>')
+
+
+# ManhuaKo
+
+def manhuako_mangas(n: int) -> bytes:
+    return html(join(
+        f'<div class="card"><img src="https://manhuako.com/covers/{i}.jpg"/>'
+        f'<p class="type">{"Novela" if i % 10 == 0 else "Manhua"}</p>'
+        f'<a class="white-text" href="https://manhuako.com/manhua/{slug(i)}">{title(i)}</a></div>'
+        for i in range(n)))
+
+
+def manhuako_chapters(n: int) -> bytes:
+    return html('<table class="table-chapters">' + join(
+        f'<tr><td><a href="https://manhuako.com/manhua/{slug(0)}/capitulo-{i}">Capítulo {i}</a></td></tr>'
+        for i in range(n, 0, -1)) + '</table>')
+
+
+def manhuako_updates(n: int) -> bytes:
+    return html(join(
+        f'<div class="card"><a class="white-text" href="https://manhuako.com/manhua/{slug(i)}">{title(i)}</a>'
+        f'<a class="chip" href="https://manhuako.com/manhua/{slug(i)}/capitulo-{i}">{i}</a></div>'
+        for i in range(n)))
+
+
+def manhuako_pictures(n: int) -> bytes:
+    return html('<div id="pantallaCompleta">' + join(
+        f'<img src="https://manhuako.com/pages/{i}.jpg"/>' for i in range(n)) + '</div>')
+
+
+# ManhuaPlus
+
+def manhuaplus_mangas(n: int) -> bytes:
+    return html('<div class="c-tabs-item">' + join(
+        f'<div class="row c-tabs-item__content"><div class="tab-thumb"><a href="https://manhuaplus.com/manga/'
+        f'{slug(i)}/" title="{title(i)}"><img data-src="https://manhuaplus.com/covers/{i}.jpg"/></a></div></div>'
+        for i in range(n)) + '</div>')
+
+
+def manhuaplus_chapters(n: int) -> bytes:
+    return html('<ul class="main version-chap">' + join(
+        f'<li class="wp-manga-chapter"><a href="https://manhuaplus.com/manga/{slug(0)}/chapter-{i}/">'
+        f' Chapter {i} </a><span class="chapter-release-date"><i>Jan 1</i></span></li>'
+        for i in range(n, 0, -1)) + '</ul>')
+
+
+def manhuaplus_updates(n: int) -> bytes:
+    return html(join(
+        f'<div class="page-item-detail"><a href="https://manhuaplus.com/manga/{slug(i)}/">{title(i)}</a>'
+        f'<div class="chapter-item"><a href="https://manhuaplus.com/manga/{slug(i)}/chapter-{i}/">{i}</a></div>'
+        f'</div>' for i in range(n)))
+
+
+def manhuaplus_pictures(n: int) -> bytes:
+    return html('<div class="reading-content">' + join(
+        f'<div class="page-break"><img src="https://manhuaplus.com/pages/{i}.jpg"/></div>' for i in range(n)) +
+                '</div>')
+
+
+# McReader
+
+def mcreader_mangas(n: int) -> bytes:
+    return json.dumps([{'manga_name': title(i), 'manga_slug': slug(i), 'manga_cover': f'{i}.jpg'}
+                       for i in range(n)]).encode()
+
+
+def mcreader_chapters(n: int) -> bytes:
+    return html('<ul class="chapter-list">' + join(
+        f'<li><a href="/reader/en/{slug(0)}-chapter-{i}-eng-li/"><strong class="chapter-title">'
+        f' chapter-{i}-eng-li </strong></a></li>' for i in range(n, 0, -1)) + '</ul>')
+
+
+def mcreader_updates(n: int) -> bytes:
+    return html('<ul class="novel-list">' + join(
+        f'<li class="novel-item"><a href="/manga/{slug(i)}/"><h4>{title(i)}</h4>'
+        f'<h5 class="chapter-title"> Chapter {i}-eng-li </h5></a></li>' for i in range(n)) + '</ul>')
+
+
+def mcreader_pictures(n: int) -> bytes:
+    return html('<div id="chapter-reader">' + join(
+        f'<img src="https://img.mreadercdn.com/pages/{i}.jpg"/>' for i in range(n)) + '</div>')
+
+
+# NineManga
+
+def ninemanga_mangas(n: int) -> bytes:
+    return html('<ul class="direlist">' + join(
+        f'<li><dl class="bookinfo"><dt><a href="https://www.ninemanga.com/manga/{i}.html">'
+        f'<img src="https://img.ninemanga.com/{i}.jpg"/></a></dt><dd><a class="bookname" '
+        f'href="https://www.ninemanga.com/manga/{i}.html">{title(i).lower()}</a></dd></dl></li>'
+        for i in range(n)) + '</ul>')
+
+
+def ninemanga_chapters(n: int) -> bytes:
+    return html('<div class="chapterbox"><ul class="sub_vol_ul">' + join(
+        f'<li><a class="chapter_list_a" href="https://www.ninemanga.com/chapter/{slug(0)}/{i}.html" '
+        f'title="{title(0)} {i}">{title(0)} {i}</a><span>Jan 1</span></li>' for i in range(n, 0, -1)) +
+                '</ul></div>')
+
+
+def ninemanga_updates(n: int) -> bytes:
+    return html('<ul class="homeupdate">' + join(
+        f'<li><a href="https://www.ninemanga.com/manga/{i}.html"><img src="/{i}.jpg"/></a><dl><dt>'
+        f'<a href="https://www.ninemanga.com/chapter/{slug(i)}/{i}.html">{i}</a></dt></dl></li>'
+        for i in range(n)) + '</ul>')
+
+
+# TMO
+
+def tmo_mangas(n: int) -> bytes:
+    return html(join(
+        f'<div class="element"><a href=" https://lectortmo.com/library/manga/{i}/{slug(i)} ">'
+        f'<div class="thumbnail book"><style>.book-thumbnail-{i}::before{{background-image: '
+        f"url('https://otakuteca.com/images/books/{i}.jpg');}}</style><div class=\"thumbnail-title\">"
+        f'<h4 class="text-truncate" title=" {title(i)} ">{title(i)}</h4></div></div></a></div>'
+        for i in range(n)))
+
+
+def tmo_chapters(n: int) -> bytes:
+    return html('<div id="chapters"><ul class="list-group">' + join(
+        f'<li class="list-group-item p-0 bg-light upload-link"><h4><a role="button">Capítulo&nbsp;{i}.00</a>'
+        f'</h4><ul class="chapter-list"><li class="list-group-item"><a class="btn btn-default btn-sm" '
+        f'href="https://lectortmo.com/view_uploads/{i}">Leer</a></li></ul></li>' for i in range(n, 0, -1)) +
+                '</ul></div>')
+
+
+def tmo_updates(n: int) -> bytes:
+    return html('<table>' + join(
+        f'<tr class="upload-file-row"><td><a href="https://lectortmo.com/view_uploads/{i}">{title(i)}</a></td>'
+        f'<td>Jan 1</td></tr>' for i in range(n)) + '</table>')
+
+
+def tmo_pictures(n: int) -> bytes:
+    return html('<div class="viewer-container container">' + join(
+        f'<div class="img-container"><img class="viewer-img" data-src="https://img1.japanreader.com/{i}.jpg"/>'
+        f'</div>' for i in range(n)) + '</div>')
+
+
+# Plugin identifier -> parser name -> page generator
+fixtures: Dict[str, Dict[str, Fixture]] = {
+    'AsuraScans': {'mangas': asurascans_mangas, 'chapters': asurascans_chapters,
+                   'updates': asurascans_updates, 'pictures': asurascans_pictures},
+    'KissManga': {'mangas': kissmanga_mangas, 'chapters': kissmanga_chapters,
+                  'updates': kissmanga_updates, 'pictures': kissmanga_pictures},
+    'MangaBuddy': {'mangas': mangabuddy_mangas, 'chapters': mangabuddy_chapters,
+                   'updates': mangabuddy_updates, 'pictures': mangabuddy_pictures},
+    'MangaDex': {'mangas': mangadex_mangas, 'chapters': mangadex_chapters, 'pictures': mangadex_pictures},
+    'MangaHasu': {'mangas': mangahasu_mangas, 'chapters': mangahasu_chapters,
+                  'updates': mangahasu_updates, 'pictures': mangahasu_pictures},
+    'MangaKakalot': {'mangas': mangakakalot_mangas, 'chapters': mangakakalot_chapters,
+                     'updates': mangakakalot_updates, 'pictures': reader_pictures},
+    'Manganato': {'mangas': manganato_mangas, 'chapters': manganato_chapters,
+                  'updates': manganato_updates, 'pictures': reader_pictures},
+    'Manganelo': {'mangas': manganelo_mangas, 'chapters': manganato_chapters,
+                  'updates': manganelo_updates, 'pictures': reader_pictures},
+    'Mangasee': {'chapters': mangasee_chapters, 'updates': mangasee_updates, 'pictures': mangasee_pictures},
+    'MangasIn': {'mangas': mangasin_mangas, 'chapters': mangasin_chapters,
+                 'updates': mangasin_updates, 'pictures': mangasin_pictures},
+    'Mangatigre': {'mangas': mangatigre_mangas, 'chapters': mangatigre_chapters,
+                   'updates': mangatigre_updates, 'pictures': mangatigre_pictures},
+    'ManhuaKo': {'mangas': manhuako_mangas, 'chapters': manhuako_chapters,
+                 'updates': manhuako_updates, 'pictures': manhuako_pictures},
+    'Manhuaplus': {'mangas': manhuaplus_mangas, 'chapters': manhuaplus_chapters,
+                   'updates': manhuaplus_updates, 'pictures': manhuaplus_pictures},
+    'McReader': {'mangas': mcreader_mangas, 'chapters': mcreader_chapters,
+                 'updates': mcreader_updates, 'pictures': mcreader_pictures},
+    # NineManga pictures need one request per page of the chapter, so they are left out
+    'NineManga': {'mangas': ninemanga_mangas, 'chapters': ninemanga_chapters, 'updates': ninemanga_updates},
+    'TMO': {'mangas': tmo_mangas, 'chapters': tmo_chapters, 'updates': tmo_updates, 'pictures': tmo_pictures},
+}
+
+
+pages_folder = Path(__file__).parent / 'pages'
+
+
+def recorded_pages(folder: Path = pages_folder) -> Dict[str, Dict[str, Tuple[str, bytes]]]:
+    """Pages saved by benchmarks.record, plugin identifier -> parser name -> (url, page)"""
+    pages = dict()
+    for index in sorted(folder.glob('*/pages.json')):
+        plugin_pages = pages.setdefault(index.parent.name, dict())
+        for parser, page in json.loads(index.read_text()).items():
+            plugin_pages[parser] = (page['url'], (index.parent / page['file']).read_bytes())
+    return pages
+
+
+def recorded_directory(folder: Path = pages_folder) -> List[dict]:
+    """Documents of the recorded Mangasee search directory, empty if it was not recorded"""
+    page = recorded_pages(folder).get('Mangasee', dict()).get('directory')
+    return json.loads(page[1]) if page else []
@@ -0,0 +1,67 @@
+"""
+Checks that every plugin parser returns the same results with lxml and with html.parser,
+and that the lazy chapter lists match the whole ones. It runs on the synthetic fixtures, which are shaped after
+the markup the parsers read, and on the real pages benchmarks.record saved when there are any.
+
+    python -m benchmarks.parity
+
+Exits with status 1 if any parser disagrees between the two tree builders.
+"""
+import argparse
+import asyncio
+import inspect
+import sys
+from pathlib import Path
+
+import plugins.client
+from benchmarks.fixtures import fixtures, pages_folder, recorded_pages
+from benchmarks.run import clients, parser_call, plugin_pages
+
+builders = ('html.parser', 'lxml')
+
+
+async def parse(call):
+    result = call()
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def main(args) -> int:
+    failures = 0
+    recorded = recorded_pages(args.pages)
+    for name in args.plugin or list(fixtures):
+        client = clients[name]()
+        for source, parser, page, url in plugin_pages(name, args.items, recorded):
+            results = dict()
+            for builder in builders:
+                plugins.client.html_parser = builder
+                try:
+                    results[builder] = await parse(parser_call(client, parser, page, url))
+                except Exception as e:
+                    results[builder] = e
+            if parser == 'chapters':
+                # The lazy chapter list must match the whole one
+                try:
+                    results['stream'] = await parse(parser_call(client, 'stream', page, url))
+                except Exception as e:
+                    results['stream'] = e
+            expected = results[builders[0]]
+            for other in list(results)[1:]:
+                actual = results[other]
+                same = not isinstance(actual, Exception) and expected == actual
+                failures += not same
+                print(f'{name:<14}{parser:<10}{source:<9}{other:<8}{"ok" if same else "MISMATCH"}')
+                if not same and args.verbose:
+                    print(f'  html.parser: {expected!r:.300}\n  {other}: {actual!r:.300}')
+    print(f'{failures} mismatches')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compares plugin parsers between lxml and html.parser')
+    parser.add_argument('--plugin', action='append', choices=list(fixtures), help='Only check these plugins')
+    parser.add_argument('--items', type=int, default=50, help='Items on every fixture page')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Show what differs')
+    parser.add_argument('--pages', type=Path, default=pages_folder, help='Folder of the pages benchmarks.record saved')
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,119 @@
+"""
+Saves real pages of every plugin into benchmarks/pages, so the parsers are measured and compared on what the
+sites actually serve and not only on benchmarks.fixtures.
+
+    python -m benchmarks.record
+    python -m benchmarks.record --plugin TMO --query "one piece"
+
+A plugin is searched, the chapters of the first manga found are listed, its updates are checked and the pictures
+of its latest chapter are read. Of the pages fetched along the way, the first one the parser gets results from is
+saved as benchmarks/pages/<plugin>/<parser>.<ext>, with the urls in pages.json. The Mangasee search directory is
+saved too and used as a real search corpus by benchmarks.run.
+Run it on an empty http_cache, pages answered with 304 Not Modified are not saved.
+"""
+import argparse
+import asyncio
+import json
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.fixtures import fixtures, pages_folder
+from benchmarks.parity import parse
+from benchmarks.run import clients, parser_call
+from models import LastChapter
+from plugins import MangaClient, MangaSeeClient
+
+
+def recording(client: MangaClient) -> List[Tuple[str, bytes]]:
+    """Makes client keep the (url, body) of every page it reads in the returned list"""
+    pages = []
+    request = client.request
+
+    async def recorded_request(url, *args, consume=None, **kwargs):
+        response, result = await request(url, *args, consume=consume, **kwargs)
+        if consume is None and response.status == 200 and result:
+            pages.append((str(url), result))
+        return response, result
+
+    client.request = recorded_request
+    return pages
+
+
+async def parsed_items(client: MangaClient, parser: str, page: bytes, url: str) -> int:
+    try:
+        if parser == 'directory':
+            return len(MangaSeeClient.directory_from_page(page))
+        return len(await parse(parser_call(client, parser, page, url)))
+    except Exception:
+        return 0
+
+
+async def capture(client: MangaClient, pages: List[Tuple[str, bytes]], parser: str,
+                  action: Callable[[], Awaitable]) -> Tuple[object, Optional[Tuple[str, bytes]]]:
+    """Result of action and the first page it read that parser gets results from"""
+    pages.clear()
+    try:
+        result = await action()
+    except Exception as e:
+        print(f'{client.name:<14}{parser:<10}failed: {e!r:.200}')
+        return None, None
+    for url, page in pages:
+        if await parsed_items(client, parser, page, url):
+            return result, (url, page)
+    print(f'{client.name:<14}{parser:<10}no page with results')
+    return result, None
+
+
+def save(folder: Path, parser: str, url: str, page: bytes) -> dict:
+    folder.mkdir(parents=True, exist_ok=True)
+    file_name = parser + ('.json' if page.lstrip()[:1] in (b'{', b'[') else '.html')
+    (folder / file_name).write_bytes(page)
+    print(f'{folder.name:<14}{parser:<10}{len(page) / 1024:>8.0f} KiB  {url}')
+    return {'file': file_name, 'url': url}
+
+
+async def record(name: str, query: str, folder: Path):
+    client = clients[name]()
+    pages = recording(client)
+    wanted = set(fixtures[name]) | ({'directory'} if name == 'Mangasee' else set())
+    saved: Dict[str, dict] = dict()
+
+    def keep(parser: str, page: Optional[Tuple[str, bytes]]):
+        if page and parser in wanted:
+            saved[parser] = save(folder / name, parser, *page)
+
+    # Mangasee searches the whole site directory, which is read instead of a page of results
+    search_parser = 'directory' if name == 'Mangasee' else 'mangas'
+    try:
+        cards, page = await capture(client, pages, search_parser, lambda: client.search(query))
+        keep(search_parser, page)
+        if not cards:
+            return
+        chapters, page = await capture(client, pages, 'chapters', lambda: client.get_chapters(cards[0]))
+        keep('chapters', page)
+        if not chapters:
+            return
+        last_chapter = LastChapter(cards[0].url, chapters[0].url)
+        _, page = await capture(client, pages, 'updates', lambda: client.check_updated_urls([last_chapter]))
+        keep('updates', page)
+        _, page = await capture(client, pages, 'pictures', lambda: client.set_pictures(chapters[0]))
+        keep('pictures', page)
+    finally:
+        if saved:
+            index = folder / name / 'pages.json'
+            old = json.loads(index.read_text()) if index.exists() else dict()
+            index.write_text(json.dumps({**old, **saved}, indent=2))
+        await client.close()
+
+
+async def main(args):
+    for name in args.plugin or list(fixtures):
+        await record(name, args.query, args.pages)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Saves real pages of the plugins for the benchmarks')
+    parser.add_argument('--plugin', action='append', choices=list(fixtures), help='Only record these plugins')
+    parser.add_argument('--query', default='one', help='Search the mangas are taken from')
+    parser.add_argument('--pages', type=Path, default=pages_folder, help='Folder the pages are saved in')
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,188 @@
+"""
+Offline benchmarks for the search engine and the plugin parsers.
+
+    python -m benchmarks.run
+    python -m benchmarks.run --plugin Mangasee --plugin TMO --items 500
+    python -m benchmarks.run --skip-parsers --corpus 10000,200000 --linear
+
+Nothing here touches the network, pages come from benchmarks.fixtures and from the real pages
+benchmarks.record saved, when there are any.
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import random
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+
+from benchmarks.fixtures import fixtures, mangasee_directory, pages_folder, recorded_directory, recorded_pages
+from plugins import *
+from plugins.search_engine import SearchIndex, linear_search
+
+clients = {
+    'AsuraScans': AsuraScansClient,
+    'KissManga': KissMangaClient,
+    'MangaBuddy': MangaBuddyClient,
+    'MangaDex': MangaDexClient,
+    'MangaHasu': MangaHasuClient,
+    'MangaKakalot': MangaKakalotClient,
+    'Manganato': ManganatoClient,
+    'Manganelo': ManganeloClient,
+    'Mangasee': MangaSeeClient,
+    'MangasIn': MangasInClient,
+    'Mangatigre': MangatigreClient,
+    'ManhuaKo': ManhuaKoClient,
+    'Manhuaplus': ManhuaPlusClient,
+    'McReader': McReaderClient,
+    'NineManga': NineMangaClient,
+    'TMO': TMOClient,
+}
+
+
+async def measure(function: Callable, repeat: int):
+    """Returns the last result, the best time in seconds and the peak of memory allocated by one call"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        if inspect.isawaitable(result):
+            result = await result
+        best = min(best, time.perf_counter() - start)
+
+    # Tracing slows everything down, so memory is measured on a separate call
+    tracemalloc.start()
+    try:
+        result = function()
+        if inspect.isawaitable(result):
+            result = await result
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, best, peak
+
+
+def bench_card(client: MangaClient, url: str = None) -> MangaCard:
+    return MangaCard(client, 'Bench', url or f'{client.base_url.geturl()}manga/bench', '')
+
+
+def parser_call(client: MangaClient, parser: str, page: bytes, url: str = None) -> Callable:
+    """Call of parser on page, url is the address a recorded page came from"""
+    manga = bench_card(client, url)
+    if parser == 'stream':
+        return lambda: list(client.iter_chapters_from_page(page, manga))
+    if parser == 'first':
+        # What an update check pays when the newest chapter is the one it already knows
+        return lambda: [next(client.iter_chapters_from_page(page, manga))]
+    response = SimpleNamespace(url=url or f'{client.base_url.geturl()}chapter/bench.html')
+    if parser == 'mangas':
+        return lambda: client.mangas_from_page(page)
+    if parser == 'chapters':
+        return lambda: client.chapters_from_page(page, manga)
+    if parser == 'updates':
+        return lambda: client.updates_from_page(page)
+    return lambda: client.pictures_from_chapters(page, response)
+
+
+def plugin_pages(name: str, items: int, recorded: Dict[str, Dict]):
+    """(source, parser, page, url) of every page a plugin parser is measured on"""
+    for parser, fixture in fixtures[name].items():
+        yield 'fixture', parser, fixture(items), None
+    for parser, (url, page) in recorded.get(name, dict()).items():
+        if parser in fixtures[name]:
+            yield 'real', parser, page, url
+
+
+async def bench_parsers(plugins: List[str], items: int, repeat: int, pages: Path) -> List[Dict]:
+    rows = []
+    recorded = recorded_pages(pages)
+    print(f'{"plugin":<14}{"parser":<10}{"page":<9}{"items":>7}{"KiB":>8}{"ms/page":>10}{"peak KiB":>10}')
+    for name in plugins:
+        client = clients[name]()
+        for source, page_parser, page, url in plugin_pages(name, items, recorded):
+            for parser in ([page_parser, 'first'] if page_parser == 'chapters' else [page_parser]):
+                result, seconds, peak = await measure(parser_call(client, parser, page, url), repeat)
+                row = dict(plugin=name, parser=parser, page=source, items=len(result), size=len(page),
+                           ms=seconds * 1000, peak=peak)
+                rows.append(row)
+                print(f'{name:<14}{parser:<10}{source:<9}{row["items"]:>7}{len(page) / 1024:>8.0f}'
+                      f'{row["ms"]:>10.2f}{peak / 1024:>10.0f}')
+    return rows
+
+
+def queries_for(documents: List[dict], count: int) -> List[str]:
+    rng = random.Random(count)
+    queries = []
+    for _ in range(count):
+        words = rng.choice(documents)['s'].lower().split()
+        query = ' '.join(words[:rng.randint(1, len(words))])
+        if rng.random() < 0.3:
+            # A fragment of a word, which substring search must still find
+            query = query[:max(3, len(query) - 2)]
+        queries.append(query)
+    return queries
+
+
+async def bench_search(sizes: List[int], queries: int, linear: bool, pages: Path) -> List[Dict]:
+    rows = []
+    print(f'{"engine":<16}{"corpus":<11}{"docs":>8}{"build s":>9}{"queries/s":>11}{"docs/s":>14}{"peak KiB":>10}')
+
+    def report(engine, corpus, size, build, seconds, count, peak):
+        row = dict(engine=engine, corpus=corpus, docs=size, build=build, qps=count / seconds,
+                   docs_per_second=size * count / seconds, peak=peak)
+        rows.append(row)
+        print(f'{engine:<16}{corpus:<11}{size:>8}{build:>9.2f}{row["qps"]:>11.1f}{row["docs_per_second"]:>14.0f}'
+              f'{peak / 1024:>10.0f}')
+
+    corpora = [('synthetic', mangasee_directory(size)) for size in sizes]
+    recorded = recorded_directory(pages)
+    if recorded:
+        corpora.append(('real', recorded))
+    for corpus, documents in corpora:
+        size = len(documents)
+        sample = queries_for(documents, queries)
+        get_title, get_text = MangaSeeClient.title_from_document, MangaSeeClient.text_from_document
+
+        index, build, build_peak = await measure(lambda: SearchIndex(documents, get_title, get_text), 1)
+        for engine, fuzzy in (('index', False), ('index fuzzy', True)):
+            _, seconds, peak = await measure(lambda: [index.top_k(q, 20, fuzzy=fuzzy) for q in sample], 1)
+            report(engine, corpus, size, build, seconds, len(sample), max(peak, build_peak))
+
+        if linear:
+            few = sample[:max(1, queries // 10)]
+            _, seconds, peak = await measure(lambda: [linear_search(q, documents, get_title, get_text) for q in few],
+                                             1)
+            report('linear', corpus, size, 0, seconds, len(few), peak)
+    return rows
+
+
+async def main(args):
+    results = dict()
+    if not args.skip_parsers:
+        results['parsers'] = await bench_parsers(args.plugin or list(fixtures), args.items, args.repeat, args.pages)
+        print()
+    if not args.skip_search:
+        sizes = [int(size) for size in args.corpus.split(',')]
+        results['search'] = await bench_search(sizes, args.queries, args.linear, args.pages)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Offline benchmarks for the search engine and the plugin parsers')
+    parser.add_argument('--plugin', action='append', choices=list(fixtures), help='Only benchmark these plugins')
+    parser.add_argument('--items', type=int, default=100, help='Items on every fixture page')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs of every parser, the best one is reported')
+    parser.add_argument('--corpus', default='10000,50000,200000', help='Sizes of the search corpora')
+    parser.add_argument('--queries', type=int, default=200, help='Queries run against every corpus')
+    parser.add_argument('--linear', action='store_true', help='Also run the linear reference search')
+    parser.add_argument('--skip-parsers', action='store_true')
+    parser.add_argument('--skip-search', action='store_true')
+    parser.add_argument('--json', help='Also write the results to this file')
+    parser.add_argument('--pages', type=Path, default=pages_folder, help='Folder of the pages benchmarks.record saved')
+    asyncio.run(main(parser.parse_args()))
@@ -3,9 +3,11 @@ import shutil
 from ast import arg
 import asyncio
 import re
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 import datetime as dt
 import json
+import time
 
 import pyrogram.errors
 from pyrogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery, InputMediaDocument
@@ -21,14 +23,21 @@ from plugins import MangaClient, ManhuaKoClient, MangaCard, MangaChapter, Manhua
 import os
 
 from pyrogram import Client, filters
-from typing import Dict, Tuple, List, TypedDict
+from typing import Dict, Tuple, List, TypedDict, Set, Optional
 from loguru import logger
 
-from models.mongodb import mongodb, add, get, get_all, delete, erase_subs
+from models.mongodb import mongodb, add, get, get_all, delete, erase_subs, ensure_indexes, iter_subscribed_mangas, \
+    subscribed_urls
 from pagination import Pagination
 from plugins.client import clean
+from plugins.federated import federated_search
+from plugins.router import PluginRouter
 from tools.aqueue import AQueue
+from tools.fanout import broadcast_pacer
 from tools.flood import retry_on_flood
+from tools.loopmonitor import loop_monitor
+from tools.pollscheduler import poll_scheduler
+from tools.resilience import CircuitOpenError
 
 
 mangas: Dict[str, MangaCard] = dict()
@@ -36,11 +45,13 @@ chapters: Dict[str, MangaChapter] = dict()
 pdfs: Dict[str, str] = dict()
 paginations: Dict[int, Pagination] = dict()
 queries: Dict[str, Tuple[MangaClient, str]] = dict()
+federated_queries: Dict[str, Tuple[str, str]] = dict()
 full_pages: Dict[str, List[str]] = dict()
 favourites: Dict[str, MangaCard] = dict()
 language_query: Dict[str, Tuple[str, str]] = dict()
 users_in_channel: Dict[int, dt.datetime] = dict()
 locks: Dict[int, asyncio.Lock] = dict()
+chapter_builds: Dict[str, Tuple[asyncio.Lock, int]] = dict()
 
 plugin_dicts: Dict[str, Dict[str, MangaClient]] = {
     "🇬🇧 EN": {
@@ -102,6 +113,9 @@ for lang, plugin_dict in plugin_dicts.items():
 # subsPaused = ["[🇪🇸 ES] TMO"]
 subsPaused = disabled + []
 
+# Built once, plugins do not change while the bot runs
+router = PluginRouter(plugins)
+
 
 def split_list(li):
     return [li[x: x + 2] for x in range(0, len(li), 2)]
@@ -114,6 +128,8 @@ bot = Client('bot',
              max_concurrent_transmissions=3)
 
 pdf_queue = AQueue()
+# Chapter urls to broadcast, locked by manga url so the chapters of a manga go out in order
+broadcast_queue = AQueue()
 
 def get_buttons_for_options(user_options: int):
     buttons = []
@@ -212,7 +228,10 @@ async def on_help(client: Client, message: Message):
 
 @bot.on_message(filters=filters.command(['queue']))
 async def on_help(client: Client, message: Message):
-    await message.reply(f'Queue size: {pdf_queue.qsize()}')
+    stats = loop_monitor.stats()
+    await message.reply(f'Queue size: {pdf_queue.qsize()}\n'
+                        f'Event loop blocked: {stats["blocked_ms"]:.0f} ms in the last {stats["window_s"]:.0f} s '
+                        f'(longest {stats["max_ms"]:.0f} ms)')
 
 
 @bot.on_message(filters=filters.command(['refresh']))
@@ -314,7 +333,9 @@ async def language_click(client, callback: CallbackQuery):
         ))
     for identifier, manga_client in plugin_dicts[lang].items():
         queries[f"query_{lang}_{identifier}_{hash(query)}"] = (manga_client, query)
+    federated_queries[f"all_{lang}_{hash(query)}"] = (lang, query)
     await callback.message.edit(f"Language: {lang}\n\nSelect search plugin.", reply_markup=InlineKeyboardMarkup(
+        [[InlineKeyboardButton("🔎 All sources", callback_data=f"all_{lang}_{hash(query)}")]] +
         split_list([InlineKeyboardButton(identifier, callback_data=f"query_{lang}_{identifier}_{hash(query)}")
                     for identifier in plugin_dicts[lang].keys() if f'[{lang}] {identifier}' not in disabled]) + [
             [InlineKeyboardButton("◀️ Back", callback_data=f"lang_None_{hash(query)}")]]
@@ -324,7 +345,7 @@ async def language_click(client, callback: CallbackQuery):
 async def plugin_click(client, callback: CallbackQuery):
     db = await mongodb()
     manga_client, query = queries[callback.data]
-    results = await manga_client.search(query)
+    results = await manga_client.cached_search(query)
     if not results:
         await bot.send_message(callback.from_user.id, "No manga found for given query.")
         return
@@ -337,6 +358,25 @@ async def plugin_click(client, callback: CallbackQuery):
                            ]))
 
 
+async def all_sources_click(client, callback: CallbackQuery):
+    lang, query = federated_queries[callback.data]
+    manga_clients = {identifier: manga_client for identifier, manga_client in plugin_dicts[lang].items()
+                     if f'[{lang}] {identifier}' not in disabled and not manga_client.breaker.is_open}
+    federated = await federated_search(manga_clients, query)
+    results = federated.results[:40]
+    if not results:
+        await bot.send_message(callback.from_user.id, "No manga found for given query.")
+        return
+    for _, result in results:
+        mangas[result.unique()] = result
+    await bot.send_message(callback.from_user.id,
+                           "This is the result of your search",
+                           reply_markup=InlineKeyboardMarkup([
+                               [InlineKeyboardButton(f'{result.name} [{identifier}]', callback_data=result.unique())]
+                               for identifier, result in results
+                           ]))
+
+
 async def manga_click(client, callback: CallbackQuery, pagination: Pagination = None):
     db = await mongodb()
     if pagination is None:
@@ -416,7 +456,40 @@ async def chapter_click(client, data, chat_id):
     await pdf_queue.put(chapters[data], int(chat_id))
 
 
-async def send_manga_chapter(client: Client, chapter, chat_id):
+@asynccontextmanager
+async def chapter_build(chapter_url: str):
+    lock, users = chapter_builds.get(chapter_url, (None, 0))
+    lock = lock or asyncio.Lock()
+    chapter_builds[chapter_url] = (lock, users + 1)
+    try:
+        async with lock:
+            yield
+    finally:
+        lock, users = chapter_builds[chapter_url]
+        if users == 1:
+            del chapter_builds[chapter_url]
+        else:
+            chapter_builds[chapter_url] = (lock, users - 1)
+
+
+async def send_manga_chapter(client: Client, chapter, chat_id, raise_unavailable: bool = False):
+    # The first worker for a chapter builds and uploads it, workers for other users wait on it and are then
+    # served from the stored file ids. Formats share one chapter_files record and one pictures folder, so
+    # builds of other formats of the chapter wait too and only make the formats still missing.
+    # With raise_unavailable a source whose circuit is open raises CircuitOpenError instead of telling the user.
+    db = await mongodb()
+    options = await get(db, "manga_output", {"_id": str(chat_id)})
+    options = options.get("output", (1 << 30) - 1) if options else (1 << 30) - 1
+    async with chapter_build(chapter.url):
+        chapter_file = await get(db, "chapter_files", {"_id": chapter.url}) or {}
+        delivery = cached_delivery(chapter, chapter_file, options)
+        if delivery is None:
+            return await build_manga_chapter(client, chapter, chat_id, raise_unavailable)
+    # Sending stored files needs no lock, a FloodWait of this user does not hold back the others
+    await send_cached(client, chat_id, delivery)
+
+
+async def build_manga_chapter(client: Client, chapter, chat_id, raise_unavailable: bool = False):
     db = await mongodb()
     chapter_file = await get(db, "chapter_files", {"_id": chapter.url})
     options = await get(db, "manga_output", {"_id": str(chat_id)})
@@ -446,7 +519,12 @@ async def send_manga_chapter(client: Client, chapter, chat_id):
     download = download and options & ((1 << len(OutputOptions)) - 1) != 0
 
     if download:
-        pictures_folder = await chapter.client.download_pictures(chapter)
+        try:
+            pictures_folder = await chapter.client.download_pictures(chapter)
+        except CircuitOpenError as e:
+            if raise_unavailable:
+                raise
+            return await client.send_message(chat_id, f'{e}, please try again later.\n\n{error_caption}')
         if not chapter.pictures:
             return await client.send_message(chat_id,
                                           f'There was an error parsing this chapter or chapter is missing' +
@@ -520,6 +598,139 @@ async def send_manga_chapter(client: Client, chapter, chat_id):
         await add(db, "chapter_files", chapter_file_dict)
 
 
+def cached_delivery(chapter: MangaChapter, chapter_file: dict, options: int) -> Optional[Tuple[List[str], str]]:
+    """File ids and caption of a chapter for the given output options, None if a file is not uploaded yet"""
+    caption = f'{chapter.manga.name} - {chapter.name}\n'
+    if options & OutputOptions.Telegraph:
+        if not chapter_file.get("telegraph_url"):
+            return None
+        caption += f'[Read on telegraph]({chapter_file["telegraph_url"]})\n'
+    caption += f'[Read on website]({chapter.get_url()})'
+    file_ids = []
+    for option, key in ((OutputOptions.PDF, "file_id"), (OutputOptions.CBZ, "cbz_id")):
+        if options & option:
+            if not chapter_file.get(key):
+                return None
+            file_ids.append(chapter_file[key])
+    return file_ids, caption
+
+
+async def send_cached(client: Client, chat_id: int, delivery: Tuple[List[str], str]):
+    file_ids, caption = delivery
+    await broadcast_pacer.wait(chat_id, max(len(file_ids), 1))
+    if not file_ids:
+        return await retry_on_flood(client.send_message)(chat_id, caption)
+    media_docs = [InputMediaDocument(file_id) for file_id in file_ids]
+    media_docs[-1].caption = caption
+    return await retry_on_flood(client.send_media_group)(chat_id, media_docs)
+
+
+async def broadcast(db, url: str, chapter: MangaChapter, users: List[str]):
+    """Stores a delivery of chapter to users, it survives restarts until every user got it"""
+    ident = router.resolve(url)
+    await db["broadcasts"].update_one({"_id": chapter.url}, {
+        "$setOnInsert": {
+            "plugin": ident,
+            "manga": {"name": chapter.manga.name, "url": chapter.manga.url, "picture_url": chapter.manga.picture_url},
+            "chapter": {"name": chapter.name, "url": chapter.url},
+            "created": time.time(),
+        },
+        "$addToSet": {"pending": {"$each": users}},
+    }, upsert=True)
+    await broadcast_queue.put(chapter.url, chapter.manga.url)
+
+
+def broadcast_chapter(doc: dict) -> Optional[MangaChapter]:
+    chapter = chapters.get(str(hash(doc["_id"])))
+    if chapter:
+        return chapter
+    # Broadcasts resumed after a restart
+    client = plugins.get(doc["plugin"])
+    if client is None:
+        return None
+    manga = MangaCard(client, doc["manga"]["name"], doc["manga"]["url"], doc["manga"]["picture_url"])
+    return MangaChapter(client, doc["chapter"]["name"], doc["chapter"]["url"], manga, [])
+
+
+async def run_broadcast(db, chapter_url: str):
+    doc = await get(db, "broadcasts", {"_id": chapter_url})
+    if not doc or not doc.get("pending"):
+        return await delete(db, "broadcasts", chapter_url)
+    chapter = broadcast_chapter(doc)
+    if chapter is None:
+        logger.warning(f'Dropping broadcast of {chapter_url}, plugin {doc["plugin"]} is not available')
+        return await delete(db, "broadcasts", chapter_url)
+
+    pending = doc["pending"]
+    outputs = {output["_id"]: output.get("output", (1 << 30) - 1) async for output in
+               db["manga_output"].find({"_id": {"$in": pending}}, {"output": 1})}
+    groups: Dict[int, List[str]] = dict()
+    for user in pending:
+        groups.setdefault(outputs.get(user, (1 << 30) - 1), []).append(user)
+
+    async def sent(users: List[str]):
+        await db["broadcasts"].update_one({"_id": chapter_url}, {"$pullAll": {"pending": users}})
+
+    async def deliver(user: str, send):
+        try:
+            await send(int(user))
+        except pyrogram.errors.UserIsBlocked:
+            logger.info(f'User {user} blocked the bot')
+            await remove_subscriptions(user)
+        except CircuitOpenError:
+            # The broadcast stops with the user still pending, broadcast_worker runs it again later
+            raise
+        except Exception as e:
+            logger.exception(f'An exception occurred sending new chapter to {user}: {e}')
+
+    logger.debug(f'Broadcasting {chapter.manga.name} - {chapter.name} to {len(pending)} users')
+    for options, users in groups.items():
+        chapter_file = await get(db, "chapter_files", {"_id": chapter.url}) or {}
+        delivery = cached_delivery(chapter, chapter_file, options)
+        # Users of the group take turns getting the chapter built and uploaded until one upload works, the rest
+        # get the stored files
+        while delivery is None and users:
+            builder, users = users[0], users[1:]
+            await deliver(builder, lambda chat_id: send_manga_chapter(bot, chapter, chat_id, raise_unavailable=True))
+            await sent([builder])
+            chapter_file = await get(db, "chapter_files", {"_id": chapter.url}) or {}
+            delivery = cached_delivery(chapter, chapter_file, options)
+        batch_size = max(int(broadcast_pacer.bucket.rate), 1)
+        for start in range(0, len(users), batch_size):
+            batch = users[start:start + batch_size]
+            await asyncio.gather(*(deliver(user, lambda chat_id: send_cached(bot, chat_id, delivery))
+                                   for user in batch))
+            await sent(batch)
+    await delete(db, "broadcasts", chapter_url)
+
+
+async def requeue_broadcast(chapter_url: str, manga_url: str, delay: float):
+    await asyncio.sleep(max(delay, 1))
+    await broadcast_queue.put(chapter_url, manga_url)
+
+
+async def broadcast_worker(worker_id: int = 0):
+    while True:
+        chapter_url, manga_url = await broadcast_queue.get(worker_id)
+        try:
+            await run_broadcast(await mongodb(), chapter_url)
+        except CircuitOpenError as e:
+            logger.info(f'Delaying the broadcast of {chapter_url}, {e}')
+            asyncio.get_running_loop().create_task(requeue_broadcast(chapter_url, manga_url, e.retry_in))
+        except BaseException as e:
+            logger.exception(f'An exception occurred broadcasting {chapter_url}: {e}')
+        finally:
+            broadcast_queue.release(manga_url)
+
+
+async def broadcaster(workers: int = 3):
+    """Resumes the broadcasts a restart interrupted and delivers new ones, chapters of a manga in order"""
+    db = await mongodb()
+    async for doc in db["broadcasts"].find({}, {"manga.url": 1}).sort("created", 1):
+        await broadcast_queue.put(doc["_id"], doc["manga"]["url"])
+    await asyncio.gather(*(broadcast_worker(i + 1) for i in range(workers)))
+
+
 async def pagination_click(client: Client, callback: CallbackQuery):
     pagination_id, page = map(int, callback.data.split('_'))
     pagination = paginations[pagination_id]
@@ -545,6 +756,7 @@ async def favourite_click(client: Client, callback: CallbackQuery):
     sub_dict = {
         "url": manga.url,
         "user_id": str(callback.from_user.id),
+        "plugin": router.resolve(manga.url),
         "custom_caption": None,
         "custom_filename": None
     }
@@ -597,6 +809,8 @@ def is_pagination_data(callback: CallbackQuery):
 async def on_callback_query(client, callback: CallbackQuery):
     if callback.data in queries:
         await plugin_click(client, callback)
+    elif callback.data in federated_queries:
+        await all_sources_click(client, callback)
     elif callback.data in mangas:
         await manga_click(client, callback)
     elif callback.data in chapters:
@@ -622,117 +836,170 @@ async def on_callback_query(client, callback: CallbackQuery):
 
 async def remove_subscriptions(sub: str):
     db = await mongodb()
-    await db.erase_subs(sub)
+    await erase_subs(db, sub)
 
 
 async def update_mangas():
     db = await mongodb()
     logger.debug("Updating mangas")
-    subscriptions = await get_all(db, "subscriptions")
-    last_chapters = await get_all(db, "last_chapters")
-    manga_names = await get_all(db, "manga_names")
-
-    subs_dictionary = dict()
-    chapters_dictionary = dict()
     url_client_dictionary = dict()
     client_url_dictionary = {client: set() for client in plugins.values()}
-    manga_dict = dict()
-
-    for subscription in subscriptions:
-        if subscription.get("url") not in subs_dictionary:
-            subs_dictionary[subscription.get("url")] = []
-        subs_dictionary[subscription.get("url")].append(subscription.get("user_id"))
-
-    for last_chapter in last_chapters:
-        chapters_dictionary[last_chapter.get("url")] = last_chapter
-
-    for manga in manga_names:
-        manga_dict[manga.get("url")] = manga
-
-    for url in subs_dictionary:
-        for ident, client in plugins.items():
-            if ident in subsPaused:
-                continue
-            if await client.contains_url(url):
-                url_client_dictionary[url] = client
-                client_url_dictionary[client].add(url)
-
-    for client, urls in client_url_dictionary.items():
-        logger.debug(f'Updating {client.name}')
-        logger.debug(f'Urls:\t{list(urls)}')
-        new_urls = [url for url in urls if not chapters_dictionary.get(url)]
-        logger.debug(f'New Urls:\t{new_urls}')
-        to_check = [chapters_dictionary[url] for url in urls if chapters_dictionary.get("url")]
-        if len(to_check) == 0:
+
+    if not poll_scheduler.loaded:
+        await ensure_indexes(db)
+        poll_scheduler.load(await get_all(db, "schedules"))
+
+    due = poll_scheduler.pop_due()
+    # Only the records of the mangas that are due are read
+    due_mangas = dict()
+    try:
+        subscribed = await subscribed_urls(db)
+        due.update(url for url in subscribed if poll_scheduler.is_new(url))
+        async for manga in iter_subscribed_mangas(db, due):
+            due_mangas[manga["url"]] = manga
+    except BaseException:
+        poll_scheduler.postpone_unscheduled(due)
+        raise
+    unsubscribed = list(due - due_mangas.keys())
+    for url in unsubscribed:
+        # Nobody is subscribed anymore
+        poll_scheduler.forget(url)
+    if unsubscribed:
+        try:
+            await db["schedules"].delete_many({"_id": {"$in": unsubscribed}})
+        except Exception as e:
+            # Schedules left behind are forgotten again when they come due after a restart
+            logger.exception(f'Error deleting the schedules of unsubscribed mangas: {e}')
+    logger.debug(f'{len(due_mangas)} of {len(subscribed)} mangas are due for a check')
+
+    for url, manga in due_mangas.items():
+        ident = manga.get("plugin")
+        if ident not in plugins:
+            # Subscriptions made before the plugin was stored with them, or whose plugin was renamed
+            ident = router.resolve(url)
+        if ident is None or ident in subsPaused:
+            poll_scheduler.postpone(url)
             continue
+        url_client_dictionary[url] = plugins[ident]
+
+    for url, client in url_client_dictionary.items():
+        client_url_dictionary[client].add(url)
+
+    async def update_client(client: MangaClient, urls: Set[str]):
+        try:
+            start = dt.datetime.now()
+            updated = await check_client(db, client, urls, due_mangas)
+            logger.debug(f'Updated {client.name} in {dt.datetime.now() - start}')
+            await notify_updates(db, updated, due_mangas)
+        except BaseException as e:
+            logger.exception(f'An exception occurred updating {client.name}: {e}')
+            # The urls were taken off the schedule when they came due, none may be left without a next check
+            poll_scheduler.postpone_unscheduled(urls)
+
+    # Every site is swept on its own, the host limiters keep each one within its request budget
+    await asyncio.gather(*(update_client(client, urls) for client, urls in client_url_dictionary.items() if urls))
+
+
+async def check_client(db, client: MangaClient, urls: Set[str], due_mangas: Dict[str, dict]) \
+        -> Dict[str, List[MangaChapter]]:
+    """New chapters of the client mangas, oldest first. Mangas without a last chapter only get it stored."""
+    if client.breaker.is_open:
+        logger.debug(f'Skipping {client.name}, site is failing')
+        for url in urls:
+            poll_scheduler.postpone(url)
+        return dict()
+    logger.debug(f'Updating {client.name}')
+    logger.debug(f'Urls:\t{list(urls)}')
+    new_urls = [url for url in urls if not due_mangas[url].get("last_chapter")]
+    logger.debug(f'New Urls:\t{new_urls}')
+    to_check = [LastChapter(url, due_mangas[url]["last_chapter"].get("chapter_url")) for url in urls
+                if due_mangas[url].get("last_chapter")]
+    if to_check and client.complete_update_check:
         try:
             updated, not_updated = await client.check_updated_urls(to_check)
         except BaseException as e:
+            # Every manga is then checked on its own
             logger.exception(f"Error while checking updates for site: {client.name}, err: {e}")
-            updated = []
-            not_updated = list(urls)
+            updated = [lc.url for lc in to_check]
+            not_updated = []
+        urls = set(urls) - set(not_updated)
         for url in not_updated:
-            del url_client_dictionary[url]
+            await schedule_check(db, url, False)
         logger.debug(f'Updated:\t{list(updated)}')
         logger.debug(f'Not Updated:\t{list(not_updated)}')
 
     updated = dict()
+    semaphore = asyncio.Semaphore(client.updates_concurrency)
 
-    for url, client in url_client_dictionary.items():
-        try:
-            if url not in manga_dict:
-                continue
-            manga_name = manga_dict[url]["name"]
-            if url not in chapters_dictionary:
-                agen = client.iter_chapters(url, manga_name)
-                last_chapter = await anext(agen)
-                last_chapter_dict = {
-                    "url": url,
-                    "chapter_url": last_chapter.url
-                }
-                await add(db, "last_chapters", last_chapter_dict)
-                await asyncio.sleep(10)
-            else:
-                last_chapter = chapters_dictionary[url]
-                new_chapters: List[MangaChapter] = []
-                counter = 0
-                async for chapter in client.iter_chapters(url, manga_name):
-                    if chapter.url == last_chapter.get("chapter_url"):
-                        break
-                    new_chapters.append(chapter)
-                    counter += 1
-                    if counter == 20:
-                        break
-                if new_chapters:
-                    last_chapter["chapter_url"] = new_chapters[0].url
+    async def check_manga(url: str):
+        async with semaphore:
+            released = False
+            try:
+                manga_name = due_mangas[url].get("name")
+                if manga_name is None:
+                    return
+                if not due_mangas[url].get("last_chapter"):
+                    agen = client.iter_chapters(url, manga_name)
+                    last_chapter = await anext(agen)
                     last_chapter_dict = {
-                        "_id": last_chapter["_id"],
-                        "chapter_url": new_chapters[0].url
+                        "url": url,
+                        "chapter_url": last_chapter.url
                     }
                     await add(db, "last_chapters", last_chapter_dict)
-                    updated[url] = list(reversed(new_chapters))
-                    for chapter in new_chapters:
-                        if chapter.unique() not in chapters:
-                            chapters[chapter.unique()] = chapter
-                await asyncio.sleep(1)
-        except BaseException as e:
-            logger.exception(f'An exception occurred getting new chapters for url {url}: {e}')
+                else:
+                    last_chapter = due_mangas[url]["last_chapter"]
+                    new_chapters: List[MangaChapter] = []
+                    counter = 0
+                    async for chapter in client.iter_chapters(url, manga_name):
+                        if chapter.url == last_chapter.get("chapter_url"):
+                            break
+                        new_chapters.append(chapter)
+                        counter += 1
+                        if counter == 20:
+                            break
+                    if new_chapters:
+                        last_chapter["chapter_url"] = new_chapters[0].url
+                        last_chapter_dict = {
+                            "_id": last_chapter["_id"],
+                            "chapter_url": new_chapters[0].url
+                        }
+                        await add(db, "last_chapters", last_chapter_dict)
+                        updated[url] = list(reversed(new_chapters))
+                        released = True
+                        for chapter in new_chapters:
+                            if chapter.unique() not in chapters:
+                                chapters[chapter.unique()] = chapter
+                client.confirm_update_check(url)
+            except BaseException as e:
+                logger.exception(f'An exception occurred getting new chapters for url {url}: {e}')
+            finally:
+                await schedule_check(db, url, released)
+
+    # Every manga gets its next check even if others fail
+    results = await asyncio.gather(*(check_manga(url) for url in urls), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return updated
 
-    blocked = set()
+
+async def schedule_check(db, url: str, released: bool):
+    schedule = poll_scheduler.record(url, released)
+    try:
+        await add(db, "schedules", schedule.to_dict())
+    except Exception as e:
+        # The next check is already set in memory, the stored one is only read after a restart
+        logger.exception(f'Error storing the schedule of {url}: {e}')
+
+
+async def notify_updates(db, updated: Dict[str, List[MangaChapter]], due_mangas: Dict[str, dict]):
     for url, chapter_list in updated.items():
         for chapter in chapter_list:
             logger.debug(f'Updating {chapter.manga.name} - {chapter.name}')
-            for sub in subs_dictionary[url]:
-                if sub in blocked:
-                    continue
-                try:
-                    await pdf_queue.put(chapter, int(sub))
-                except pyrogram.errors.UserIsBlocked:
-                    logger.info(f'User {sub} blocked the bot')
-                    await remove_subscriptions(sub)
-                    blocked.add(sub)
-                except BaseException as e:
-                    logger.exception(f'An exception occurred sending new chapter: {e}')
+            try:
+                await broadcast(db, url, chapter, due_mangas[url]["users"])
+            except BaseException as e:
+                logger.exception(f'An exception occurred sending new chapter: {e}')
 
 
 async def manga_updater():
@@ -743,7 +1010,11 @@ async def manga_updater():
             start = dt.datetime.now()
             await update_mangas()
             elapsed = dt.datetime.now() - start
-            wait_time = max((dt.timedelta(seconds=wait_time) - elapsed).total_seconds(), 0)
+            # Wake up for the next manga that is due, new subscriptions are picked up at least every few minutes
+            next_check = poll_scheduler.next_check()
+            if next_check is not None:
+                wait_time = min(wait_time, next_check - time.time())
+            wait_time = max(wait_time, 10)
             logger.debug(f'Time elapsed updating mangas: {elapsed}, waiting for {wait_time}')
         except BaseException as e:
             logger.exception(f'An exception occurred during chapters update: {e}')
@@ -10,3 +10,26 @@ else:
     env_vars = dict(os.environ)
 
 mongo_url = env_vars.get('MONGODB_URL') or env_vars.get('DATABASE_URL') or 'mongodb://localhost:27017'
+
+pictures_concurrency = int(env_vars.get('PICTURES_CONCURRENCY') or 8)
+updates_concurrency = int(env_vars.get('UPDATES_CONCURRENCY') or 4)
+updates_min_interval = float(env_vars.get('UPDATES_MIN_MINUTES') or 5) * 60
+updates_max_interval = float(env_vars.get('UPDATES_MAX_HOURS') or 24) * 3600
+
+broadcast_rate = float(env_vars.get('BROADCAST_RATE') or 25)
+
+host_concurrency = int(env_vars.get('HOST_CONCURRENCY') or 16)
+host_rate = float(env_vars.get('HOST_RATE') or 8)
+host_burst = int(env_vars.get('HOST_BURST') or 16)
+
+http_cache_dir = env_vars.get('HTTP_CACHE_DIR') or 'http_cache'
+http_cache_entries = int(env_vars.get('HTTP_CACHE_ENTRIES') or 5000)
+http_cache_bytes = int(env_vars.get('HTTP_CACHE_MB') or 256) * 1024 * 1024
+http_cache_max_page = int(env_vars.get('HTTP_CACHE_MAX_PAGE_KB') or 2048) * 1024
+
+page_store_dir = env_vars.get('PAGE_STORE_DIR') or 'page_store'
+page_store_bytes = int(env_vars.get('PAGE_STORE_MB') or 2048) * 1024 * 1024
+page_store_days = float(env_vars.get('PAGE_STORE_DAYS') or 30)
+
+parse_processes = int(env_vars.get('PARSE_PROCESSES') or 2)
+parse_threshold = int(env_vars.get('PARSE_THRESHOLD_KB') or 128) * 1024
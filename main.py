@@ -4,13 +4,21 @@ import uvloop
 
 uvloop.install()
 from logger import logger
-from bot import bot, manga_updater, chapter_creation
+from bot import bot, manga_updater, chapter_creation, broadcaster
 from models import mongodb
+from tools.loopmonitor import loop_monitor
+from tools.pagestore import page_store
+from tools.parsepool import parse_pool
 
 if __name__ == '__main__':
+    # Fork the parse workers before mongo and the executors start any thread
+    parse_pool.start()
     loop = aio.get_event_loop_policy().get_event_loop()
     loop.run_until_complete(mongodb())
     loop.create_task(manga_updater())
+    loop.create_task(broadcaster())
+    loop.create_task(page_store.janitor())
+    loop.create_task(loop_monitor.run())
     for i in range(10):
         loop.create_task(chapter_creation(i + 1))
     bot.run()
@@ -1,6 +1,6 @@
 import asyncio
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorCollection
-from typing import List
+from typing import Iterable, List, AsyncIterator
 from config import mongo_url
 
 async def mongodb() -> AsyncIOMotorDatabase:
@@ -29,3 +29,38 @@ async def delete(db: AsyncIOMotorDatabase, collection_name: str, id):
 
 async def erase_subs(db: AsyncIOMotorDatabase, user_id: str):
     await db["subscriptions"].delete_many({"user_id": user_id})
+
+async def ensure_indexes(db: AsyncIOMotorDatabase):
+    # Looked up by url for every subscribed manga during the update sweep
+    await db["last_chapters"].create_index("url")
+    await db["manga_names"].create_index("url")
+    # Lets the subscribed urls be listed from the index alone
+    await db["subscriptions"].create_index("url")
+
+async def subscribed_urls(db: AsyncIOMotorDatabase) -> List[str]:
+    return await db["subscriptions"].distinct("url")
+
+async def iter_subscribed_mangas(db: AsyncIOMotorDatabase, urls: Iterable[str],
+                                 batch_size: int = 500) -> AsyncIterator[dict]:
+    """
+    One record per subscribed manga out of urls, joined on the server: url, users, plugin, last_chapter and name.
+    last_chapter and name are missing for mangas that do not have them yet.
+    """
+    pipeline = [
+        # Only the mangas asked for are grouped and joined
+        {"$match": {"url": {"$in": list(urls)}}},
+        {"$project": {"_id": 0, "url": 1, "user_id": 1, "plugin": 1}},
+        {"$group": {"_id": "$url", "users": {"$addToSet": "$user_id"}, "plugin": {"$max": "$plugin"}}},
+        {"$lookup": {"from": "last_chapters", "localField": "_id", "foreignField": "url", "as": "last_chapter"}},
+        {"$lookup": {"from": "manga_names", "localField": "_id", "foreignField": "url", "as": "manga_name"}},
+        {"$project": {
+            "_id": 0,
+            "url": "$_id",
+            "users": 1,
+            "plugin": 1,
+            "last_chapter": {"$arrayElemAt": ["$last_chapter", 0]},
+            "name": {"$arrayElemAt": ["$manga_name.name", 0]},
+        }},
+    ]
+    async for doc in db["subscriptions"].aggregate(pipeline, allowDiskUse=True, batchSize=batch_size):
+        yield doc
@@ -1,9 +1,7 @@
 from typing import List, AsyncIterable
 from urllib.parse import urlparse, urljoin, quote, quote_plus
 
-from bs4 import BeautifulSoup
-
-from plugins.client import MangaClient, MangaCard, MangaChapter, LastChapter
+from plugins.client import MangaClient, MangaCard, MangaChapter, LastChapter, html_soup, has_ancestor
 
 
 class AsuraScansClient(MangaClient):
@@ -17,11 +15,13 @@ class AsuraScansClient(MangaClient):
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:97.0) Gecko/20100101 Firefox/97.0'
     }
 
+    chapter_tag = 'li'
+
     def __init__(self, *args, name="AsuraScans", **kwargs):
         super().__init__(*args, name=name, headers=self.pre_headers, **kwargs)
 
     def mangas_from_page(self, page: bytes):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         container = bs.find("div", {"class": "listupd"})
 
@@ -37,7 +37,7 @@ class AsuraScansClient(MangaClient):
         return mangas
 
     def chapters_from_page(self, page: bytes, manga: MangaCard = None):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         container = bs.find("div", {"id": "chapterlist"})
 
@@ -50,8 +50,15 @@ class AsuraScansClient(MangaClient):
 
         return list(map(lambda x: MangaChapter(self, x[0], x[1], manga, []), zip(texts, links)))
 
+    def chapter_from_element(self, li, manga: MangaCard = None):
+        a = li.find('.//a')
+        if a is None or not has_ancestor(li, 'div', id='chapterlist'):
+            return None
+        text = a.find_class('chapternum')[0].text_content().strip()
+        return MangaChapter(self, text, a.get('href'), manga, [])
+
     def updates_from_page(self, content):
-        bs = BeautifulSoup(content, "html.parser")
+        bs = html_soup(content)
 
         manga_items = bs.find_all("div", {"class": "utao"})
 
@@ -70,7 +77,7 @@ class AsuraScansClient(MangaClient):
         return urls
 
     async def pictures_from_chapters(self, content: bytes, response=None):
-        bs = BeautifulSoup(content, "html.parser")
+        bs = html_soup(content)
 
         container = bs.find("div", {"id": "readerarea"})
 
@@ -90,15 +97,13 @@ class AsuraScansClient(MangaClient):
 
         content = await self.get_url(request_url)
 
-        return self.mangas_from_page(content)
+        return await self.parse(self.mangas_from_page, content)
 
     async def get_chapters(self, manga_card: MangaCard, page: int = 1) -> List[MangaChapter]:
 
-        request_url = f'{manga_card.url}'
-
-        content = await self.get_url(request_url)
+        chapters = await self.chapter_list(manga_card)
 
-        return self.chapters_from_page(content, manga_card)[(page - 1) * 20:page * 20]
+        return chapters[(page - 1) * 20:page * 20]
 
     async def iter_chapters(self, manga_url: str, manga_name) -> AsyncIterable[MangaChapter]:
         manga_card = MangaCard(self, manga_name, manga_url, '')
@@ -107,7 +112,7 @@ class AsuraScansClient(MangaClient):
 
         content = await self.get_url(request_url)
 
-        for chapter in self.chapters_from_page(content, manga_card):
+        for chapter in self.iter_chapters_from_page(content, manga_card):
             yield chapter
 
     async def contains_url(self, url: str):
@@ -117,7 +122,7 @@ class AsuraScansClient(MangaClient):
 
         content = await self.get_url(self.updates_url)
 
-        updates = self.updates_from_page(content)
+        updates = await self.parse(self.updates_from_page, content)
 
         updated = [lc.url for lc in last_chapters if updates.get(lc.url) and updates.get(lc.url) != lc.chapter_url]
         not_updated = [lc.url for lc in last_chapters if
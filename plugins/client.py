@@ -1,13 +1,27 @@
+import asyncio
 import os
+import uuid
 from abc import abstractmethod, ABC
 from dataclasses import dataclass
-from typing import List, AsyncIterable
+from functools import partial
+from typing import List, AsyncIterable, Callable, TypeVar, Iterator, Optional, Tuple
 
-from aiohttp import ClientSession
+from aiohttp import ClientSession, ClientResponse, ClientError
+from bs4 import BeautifulSoup
 from pathlib import Path
 
+from config import pictures_concurrency, updates_concurrency
 from models import LastChapter
 from tools import LanguageSingleton
+from tools.httpcache import http_cache
+from tools.pagestore import page_store
+from tools.parsepool import parse_pool
+from tools.ratelimit import RateLimit, rate_limiter
+from tools.resilience import CircuitBreaker, RetryBudget, backoff, host_breakers
+from tools.singleflight import SingleFlight
+from tools.ttlcache import TTLCache
+
+T = TypeVar("T")
 
 
 @dataclass
@@ -39,6 +53,86 @@ class MangaChapter:
         return str(hash(self.url))
 
 
+# Parsed results shared by every user, keyed by (plugin, normalized query, page) and by manga url
+search_cache = TTLCache(ttl=10 * 60)
+chapters_cache = TTLCache(ttl=5 * 60)
+
+retry_statuses = {429, 500, 502, 503, 504, 520, 521, 522, 523, 524}
+
+try:
+    from lxml import etree
+    from lxml.html import HtmlElement, HtmlElementClassLookup
+    html_parser = 'lxml'
+except ImportError:
+    etree = None
+    html_parser = 'html.parser'
+
+
+def html_soup(page) -> BeautifulSoup:
+    """
+    Parses a page with lxml, falling back to the much slower html.parser when lxml is not installed.
+    Plugins should only rely on find/find_all/select, which behave the same with both tree builders.
+    """
+    return BeautifulSoup(page, html_parser)
+
+
+def iter_html(text: str, tag: str, chunk_size: int = 16 * 1024) -> Iterator["HtmlElement"]:
+    """
+    Yields the tag elements of a page as soon as their closing tag is parsed, feeding lxml a chunk at a time,
+    so a caller that stops early never pays for the rest of the page. Needs lxml.
+    """
+    parser = etree.HTMLPullParser(events=('end',), tag=tag)
+    parser.set_element_class_lookup(HtmlElementClassLookup())
+    for start in range(0, len(text), chunk_size):
+        parser.feed(text[start:start + chunk_size])
+        for _, element in parser.read_events():
+            yield element
+    parser.close()
+    for _, element in parser.read_events():
+        yield element
+
+
+def has_ancestor(element: "HtmlElement", tag: str, cls: str = None, id: str = None) -> bool:
+    for ancestor in element.iterancestors(tag):
+        if (cls is None or cls in ancestor.classes) and (id is None or ancestor.get('id') == id):
+            return True
+    return False
+
+
+class CachedResponse:
+    """Stands in for a ClientResponse whose body lives in the cache folder"""
+
+    def __init__(self, url, path: Path, size: int, status=200):
+        self.url = url
+        self.path = path
+        self.size = size
+        self.status = status
+
+    async def read(self):
+        return await asyncio.get_running_loop().run_in_executor(None, self.path.read_bytes)
+
+
+def temp_path(path: Path) -> Path:
+    # Partial files live outside the chapter folder so they never end up inside a pdf or cbz
+    os.makedirs(path.parent, exist_ok=True)
+    temp_folder = Path('cache/.tmp')
+    os.makedirs(temp_folder, exist_ok=True)
+    return temp_folder / uuid.uuid4().hex
+
+
+def write_file(path: Path, content: bytes):
+    temp = temp_path(path)
+    with open(temp, 'wb') as f:
+        f.write(content)
+    os.replace(temp, path)
+
+
+def request_body_key(data):
+    if isinstance(data, dict):
+        return tuple(sorted((str(key), str(value)) for key, value in data.items()))
+    return data
+
+
 def clean(name, length=-1):
     while '  ' in name:
         name = name.replace('  ', ' ')
@@ -48,51 +142,210 @@ def clean(name, length=-1):
     return name
 
 
+def restore_client(cls, language=None) -> "MangaClient":
+    return cls(language=language) if language else cls()
+
+
 class MangaClient(ClientSession, metaclass=LanguageSingleton):
+    # Pages of a single chapter downloaded at the same time, plugins may lower it for strict sites
+    pictures_concurrency = pictures_concurrency
+    # Mangas of this plugin checked for new chapters at the same time during an update sweep
+    updates_concurrency = updates_concurrency
+    # Request budget for the plugin's base_url host, hosts without one use the HOST_* defaults
+    rate_limit: RateLimit = None
+    # Retries of a single request on top of the first try
+    max_retries = 3
+    # check_updated_urls finds every manga updated since its last check however long ago. Checks that only read
+    # the latest uploads page would miss releases that scrolled off it while a manga was not due, so the update
+    # sweep checks the due mangas of those plugins on their own instead
+    complete_update_check = False
+    # Elements that chapter_from_element turns into chapters when the chapter list is read lazily
+    chapter_tag: Optional[str] = None
 
     def __init__(self, *args, name="client", **kwargs):
         if name == "client":
             raise NotImplementedError
         super().__init__(*args, **kwargs)
         self.name = name
+        self.retry_budget = RetryBudget()
+        self.inflight = SingleFlight()
+        if self.rate_limit and getattr(self, 'base_url', None):
+            rate_limiter.configure(self.base_url.netloc, self.rate_limit)
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        """Breaker of the site host, open while the site itself is failing"""
+        return host_breakers(self.base_url.geturl())
+
+    def __reduce__(self):
+        # Clients are singletons, so a pickled client comes back as the instance of the process that loads it
+        return restore_client, (type(self), getattr(self, 'singleton_language', None))
+
+    async def parse(self, function: Callable[..., T], content, *args) -> T:
+        """Runs function(content, *args) in the parse pool if content is big enough to stall the event loop"""
+        return await parse_pool.run(function, content, *args)
+
+    async def send(self, url, *args, method='get', data=None, **kwargs):
+        if method == 'get':
+            return await self.get(url, *args, **kwargs)
+        elif method == 'post':
+            return await self.post(url, data=data or {}, **kwargs)
+        raise ValueError
+
+    async def request(self, url, *args, method='get', data=None, consume=None, **kwargs):
+        """
+        Sends a request through the limiter and the circuit breaker of its host.
+        Connection errors, timeouts and retry_statuses are retried with jittered exponential backoff while the
+        plugin retry budget allows it, the breaker counts one failure for a request that failed all its tries.
+        consume(response) runs while the connection slot is held and its result is returned along with the
+        response, by default it reads the body.
+        """
+        breaker = host_breakers(str(url))
+        breaker.check()
+        self.retry_budget.deposit()
+        attempt = 0
+        while True:
+            can_retry = attempt < self.max_retries and self.retry_budget.available()
+            try:
+                async with rate_limiter(url):
+                    response = await self.send(url, *args, method=method, data=data, **kwargs)
+                    failed = response.status in retry_statuses
+                    if failed and can_retry:
+                        response.release()
+                    else:
+                        result = await (consume or ClientResponse.read)(response)
+            except (ClientError, asyncio.TimeoutError):
+                if not can_retry:
+                    breaker.record_failure()
+                    raise
+            else:
+                if failed and not can_retry:
+                    breaker.record_failure()
+                elif not failed:
+                    breaker.record_success()
+                if not (failed and can_retry):
+                    return response, result
+            self.retry_budget.withdraw()
+            await asyncio.sleep(backoff(attempt))
+            attempt += 1
+            breaker.check()
 
     async def get_url(self, url, *args, file_name=None, cache=False, req_content=True, method='get', data=None,
-                      **kwargs):
-        def response():
-            pass
-
-        response.status = "200"
+                      stream=False, conditional=True, **kwargs):
         if cache:
+            loop = asyncio.get_running_loop()
             path = Path(f'cache/{self.name}/{file_name}')
-            os.makedirs(path.parent, exist_ok=True)
             try:
-                with open(path, 'rb') as f:
-                    content = f.read()
-            except FileNotFoundError:
-                if method == 'get':
-                    response = await self.get(url, *args, **kwargs)
-                elif method == 'post':
-                    response = await self.post(url, data=data or {}, **kwargs)
+                if req_content:
+                    content = await loop.run_in_executor(None, path.read_bytes)
+                    response = CachedResponse(url, path, len(content))
                 else:
-                    raise ValueError
-                if str(response.status).startswith('2'):
+                    # Callers that only check the status do not need the file in memory
+                    stat = await loop.run_in_executor(None, path.stat)
+                    response = CachedResponse(url, path, stat.st_size)
+            except FileNotFoundError:
+                async def consume(response):
+                    if not str(response.status).startswith('2'):
+                        return None
+                    if stream:
+                        return await self.stream_to_file(response, path)
                     content = await response.read()
-                    with open(path, 'wb') as f:
-                        f.write(content)
+                    await loop.run_in_executor(None, write_file, path, content)
+                    return content
+
+                response, result = await self.request(url, *args, method=method, data=data, consume=consume,
+                                                      **kwargs)
+                if str(response.status).startswith('2'):
+                    if stream:
+                        response = CachedResponse(url, path, result, response.status)
+                        if req_content:
+                            content = await loop.run_in_executor(None, path.read_bytes)
+                    else:
+                        content = result
         else:
-            if method == 'get':
-                response = await self.get(url, *args, **kwargs)
-            elif method == 'post':
-                response = await self.post(url, data=data or {}, **kwargs)
+            async def fetch():
+                entry = await http_cache.get(url) if conditional and method == 'get' else None
+                request_kwargs = kwargs
+                if entry:
+                    headers = {**(kwargs.get('headers') or {}), **http_cache.conditional_headers(entry)}
+                    request_kwargs = {**kwargs, 'headers': headers}
+                response, content = await self.request(url, *args, method=method, data=data, **request_kwargs)
+                if entry and response.status == 304:
+                    response = CachedResponse(url, http_cache.body_path(entry), entry['size'])
+                    try:
+                        content = await response.read()
+                    except FileNotFoundError:
+                        # The body was evicted after its validators were read, the page is asked for in full
+                        await http_cache.discard(url)
+                        return await fetch()
+                elif conditional and method == 'get' and response.status == 200:
+                    await http_cache.put(url, response.headers, content)
+                return response, content
+
+            if req_content:
+                # Only the body can be shared, callers asking for the response get their own request
+                response, content = await self.inflight.do((method, url, request_body_key(data)), fetch)
             else:
-                raise ValueError
-            content = await response.read()
+                response, content = await fetch()
         if req_content:
             return content
         else:
             return response
 
-    async def set_pictures(self, manga_chapter: MangaChapter):
+    @staticmethod
+    async def stream_to_file(response, path: Path, chunk_size: int = 1 << 16) -> int:
+        loop = asyncio.get_running_loop()
+        temp = await loop.run_in_executor(None, temp_path, path)
+        size = 0
+        f = await loop.run_in_executor(None, open, temp, 'wb')
+        try:
+            async for chunk in response.content.iter_chunked(chunk_size):
+                await loop.run_in_executor(None, f.write, chunk)
+                size += len(chunk)
+        except BaseException:
+            await loop.run_in_executor(None, f.close)
+            await loop.run_in_executor(None, partial(temp.unlink, missing_ok=True))
+            raise
+        await loop.run_in_executor(None, f.close)
+        await loop.run_in_executor(None, os.replace, temp, path)
+        return size
+
+    def reader_pages(self, content: bytes, response=None) -> Optional[List[str]]:
+        """
+        Urls of the reader pages that hold the pictures of a chapter when its first page does not,
+        like readers split in pages of a few pictures each. None means the pictures are on the first page.
+        """
+        return None
+
+    def pictures_from_reader_page(self, content: bytes) -> List[str]:
+        raise NotImplementedError
+
+    async def resolve_reader_pages(self, urls: List[str], **kwargs) -> AsyncIterable[List[str]]:
+        """
+        Fetches the reader pages of a chapter at the same time, within the host limits, and yields the pictures
+        of each one in page order as soon as it and the pages before it are parsed.
+        """
+        tasks = [asyncio.ensure_future(self.get_url(url, **kwargs)) for url in urls]
+        try:
+            for task in tasks:
+                yield self.pictures_from_reader_page(await task)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def iter_pictures(self, content: bytes, response=None) -> AsyncIterable[str]:
+        """Picture urls of a chapter page in order, yielded as soon as they are known"""
+        pages = self.reader_pages(content, response)
+        if pages is None:
+            for picture in await self.pictures_from_chapters(content, response):
+                yield picture
+            return
+        async for pictures in self.resolve_reader_pages(pages):
+            for picture in pictures:
+                yield picture
+
+    async def stream_pictures(self, manga_chapter: MangaChapter) -> AsyncIterable[str]:
         requests_url = manga_chapter.url
 
         # Set manga url as the referer if there is one
@@ -100,34 +353,99 @@ class MangaClient(ClientSession, metaclass=LanguageSingleton):
         if manga_chapter.manga:
             headers['referer'] = manga_chapter.manga.url
 
-        response = await self.get(requests_url, headers=headers)
+        response, content = await self.request(requests_url, headers=headers)
+        async for picture in self.iter_pictures(content, response):
+            yield picture
 
-        content = await response.read()
+    async def set_pictures(self, manga_chapter: MangaChapter):
+        async def fetch():
+            return [picture async for picture in self.stream_pictures(manga_chapter)]
 
-        manga_chapter.pictures = await self.pictures_from_chapters(content, response)
+        pictures = await self.inflight.do(('pictures', manga_chapter.url), fetch)
+        manga_chapter.pictures = list(pictures)
 
         return manga_chapter
 
-    async def download_pictures(self, manga_chapter: MangaChapter):
-        if not manga_chapter.pictures:
-            await self.set_pictures(manga_chapter)
-
+    async def download_picture(self, manga_chapter: MangaChapter, picture: str, file_name: str):
+        path = Path(f'cache/{self.name}/{file_name}')
+        if await page_store.fetch(picture, path):
+            return CachedResponse(picture, path, path.stat().st_size)
+        # Transient failures are already retried with backoff by request
+        req = await self.get_picture(manga_chapter, picture, file_name=file_name, cache=True,
+                                     req_content=False, stream=True)
+        if not str(req.status).startswith('2'):
+            raise ValueError(f'Could not download {picture}, status {req.status}')
+        await page_store.add(picture, path)
+        return req
+
+    async def download_pictures(self, manga_chapter: MangaChapter, concurrency: int = None):
         folder_name = f'{clean(manga_chapter.manga.name)}/{clean(manga_chapter.name)}'
-        i = 0
-        for picture in manga_chapter.pictures:
+        semaphore = asyncio.Semaphore(concurrency or self.pictures_concurrency)
+
+        async def download(i: int, picture: str):
             ext = picture.split('.')[-1].split('?')[0].lower()
+            # File names keep the page order, so pages may finish in any order
             file_name = f'{folder_name}/{format(i, "05d")}.{ext}'
-            for _ in range(3):
-                req = await self.get_picture(manga_chapter, picture, file_name=file_name, cache=True,
-                                             req_content=False)
-                if str(req.status).startswith('2'):
-                    break
+            async with semaphore:
+                return await self.download_picture(manga_chapter, picture, file_name)
+
+        async def pictures():
+            if manga_chapter.pictures:
+                for picture in manga_chapter.pictures:
+                    yield picture
             else:
-                raise ValueError
-            i += 1
+                # Pages start downloading as soon as their urls are parsed
+                async for picture in self.stream_pictures(manga_chapter):
+                    yield picture
+
+        urls, tasks = [], []
+        try:
+            async for picture in pictures():
+                tasks.append(asyncio.create_task(download(len(tasks), picture)))
+                urls.append(picture)
+            manga_chapter.pictures = urls
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
 
         return Path(f'cache/{manga_chapter.client.name}') / folder_name
 
+    async def cached_search(self, query: str = "", page: int = 1) -> List[MangaCard]:
+        key = (self.name, ' '.join(query.lower().split()), page)
+        return await search_cache.get_or_set(key, lambda: self.search(query, page))
+
+    async def chapter_list(self, manga_card: MangaCard, request_url: str = None, **kwargs) -> List[MangaChapter]:
+        """Whole parsed chapter list of a manga page, so paginating it costs one fetch"""
+        async def fetch():
+            content = await self.get_url(request_url or manga_card.url, **kwargs)
+            return await self.parse(self.chapters_from_page, content, manga_card)
+
+        return await chapters_cache.get_or_set(manga_card.url, fetch)
+
+    def chapter_from_element(self, element: "HtmlElement", manga: MangaCard) -> Optional[MangaChapter]:
+        """Chapter for a chapter_tag element, None if the element is not part of the chapter list"""
+        raise NotImplementedError
+
+    def iter_chapters_from_page(self, content: bytes, manga: MangaCard = None) -> Iterator[MangaChapter]:
+        """
+        Chapters of a manga page in the order of chapters_from_page, parsing the page only as far as they are read.
+        Plugins without a chapter_tag, or without lxml installed, parse the whole page first.
+        """
+        try:
+            text = content.decode() if isinstance(content, bytes) else content
+        except UnicodeDecodeError:
+            text = None
+        if self.chapter_tag is None or etree is None or text is None:
+            yield from self.chapters_from_page(content, manga)
+            return
+        for element in iter_html(text, self.chapter_tag):
+            chapter = self.chapter_from_element(element, manga)
+            if chapter is not None:
+                yield chapter
+
     async def get_picture(self, manga_chapter: MangaChapter, url, *args, **kwargs):
         return await self.get_url(url, *args, **kwargs)
 
@@ -137,6 +455,10 @@ class MangaClient(ClientSession, metaclass=LanguageSingleton):
     async def check_updated_urls(self, last_chapters: List[LastChapter]):
         return [lc.url for lc in last_chapters], []
 
+    def confirm_update_check(self, url: str):
+        """Called once the chapter list of a manga reported as updated was read and its new chapters stored"""
+        pass
+
     @abstractmethod
     async def search(self, query: str = "", page: int = 1) -> List[MangaCard]:
         raise NotImplementedError
@@ -149,6 +471,10 @@ class MangaClient(ClientSession, metaclass=LanguageSingleton):
     async def contains_url(self, url: str):
         raise NotImplementedError
 
+    def url_patterns(self) -> List[Tuple[str, str]]:
+        """(prefix, suffix) of the manga urls contains_url accepts, the url router is built from them"""
+        return [(self.base_url.geturl(), '')]
+
     @abstractmethod
     async def iter_chapters(self, manga_url: str, manga_name: str) -> AsyncIterable[MangaChapter]:
         raise NotImplementedError
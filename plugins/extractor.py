@@ -0,0 +1,73 @@
+import json
+import re
+from typing import Dict, Iterable, Iterator, Union
+
+json_decoder = json.JSONDecoder()
+json_whitespace = re.compile(r'\s*')
+
+_missing = object()
+
+
+def iter_json_array(text: str, start: int = 0) -> Iterator:
+    """Decodes the items of the JSON array that begins at text[start] one by one, as they are read"""
+    index = json_whitespace.match(text, start).end()
+    if text[index:index + 1] != '[':
+        raise ValueError(f'Expected a JSON array at position {index}')
+    index = json_whitespace.match(text, index + 1).end()
+    while text[index:index + 1] != ']':
+        item, index = json_decoder.raw_decode(text, index)
+        yield item
+        index = json_whitespace.match(text, index).end()
+        if text[index:index + 1] == ',':
+            index = json_whitespace.match(text, index + 1).end()
+        elif text[index:index + 1] != ']':
+            raise ValueError(f'Expected , or ] at position {index}')
+
+
+class PageVariables:
+    """Variables found on one page, each value is decoded the first time it is read"""
+
+    def __init__(self, text: str, positions: Dict[str, int]):
+        self.text = text
+        self.positions = positions
+        self.values = dict()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.positions
+
+    def __getitem__(self, name: str):
+        value = self.values.get(name, _missing)
+        if value is _missing:
+            value, _ = json_decoder.raw_decode(self.text, self.positions[name])
+            self.values[name] = value
+        return value
+
+    def get(self, name: str, default=None):
+        return self[name] if name in self else default
+
+    def iter_array(self, name: str) -> Iterator:
+        """Items of an array variable, decoded one by one so the caller can stop early"""
+        return iter_json_array(self.text, self.positions[name])
+
+
+class ScriptExtractor:
+    """
+    Finds the JSON values assigned to prefix.<name> in the scripts of a page, like the vm.Chapters = [...];
+    of Mangasee. Plugins declare the names they need, and all of them are located with one precompiled regex
+    in a single pass that stops as soon as every name is found. Values are only decoded when read.
+    """
+
+    def __init__(self, prefix: str, names: Iterable[str]):
+        self.names = tuple(names)
+        alternatives = '|'.join(re.escape(name) for name in self.names)
+        self.pattern = re.compile(rf'\b{re.escape(prefix)}\.({alternatives})\b\s*=(?!=)\s*')
+
+    def extract(self, page: Union[bytes, str]) -> PageVariables:
+        text = page.decode() if isinstance(page, bytes) else page
+        positions = dict()
+        for match in self.pattern.finditer(text):
+            # The first assignment of a name is the one that counts
+            positions.setdefault(match.group(1), match.end())
+            if len(positions) == len(self.names):
+                break
+        return PageVariables(text, positions)
@@ -0,0 +1,72 @@
+import asyncio
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from loguru import logger
+
+from plugins.client import MangaClient, MangaCard
+
+# Moving average of each source's search latency in seconds, by plugin name
+source_latency: Dict[str, float] = dict()
+
+
+@dataclass
+class FederatedResult:
+    # Unique results with the identifier of the source that returned them first, in arrival order
+    results: List[tuple] = field(default_factory=list)
+    latencies: Dict[str, float] = field(default_factory=dict)
+    failed: List[str] = field(default_factory=list)
+
+
+def normalize_name(name: str) -> str:
+    return re.sub(r'[\W_]+', '', name.lower())
+
+
+def record_latency(name: str, latency: float):
+    previous = source_latency.get(name)
+    source_latency[name] = latency if previous is None else 0.8 * previous + 0.2 * latency
+
+
+async def federated_search(clients: Dict[str, MangaClient], query: str, timeout: float = 8) -> FederatedResult:
+    """
+    Searches every client at the same time and merges their results as they arrive, dropping repeated urls and
+    titles. Sources that fail, or that have not answered when timeout runs out, are left out.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    deadline = start + timeout
+    tasks = {asyncio.ensure_future(client.cached_search(query)): ident for ident, client in clients.items()}
+
+    result = FederatedResult()
+    seen = set()
+    pending = set(tasks)
+    while pending:
+        done, pending = await asyncio.wait(pending, timeout=max(0.0, deadline - loop.time()),
+                                           return_when=asyncio.FIRST_COMPLETED)
+        if not done:
+            break
+        for task in done:
+            ident = tasks[task]
+            latency = loop.time() - start
+            result.latencies[ident] = latency
+            record_latency(clients[ident].name, latency)
+            if task.exception():
+                logger.warning(f'Search in {ident} failed: {task.exception()}')
+                result.failed.append(ident)
+                continue
+            for card in task.result():  # type: MangaCard
+                keys = {card.url, normalize_name(card.name)} - {''}
+                if keys & seen:
+                    continue
+                seen |= keys
+                result.results.append((ident, card))
+
+    for task in pending:
+        task.cancel()
+        ident = tasks[task]
+        result.failed.append(ident)
+        record_latency(clients[ident].name, timeout)
+    logger.debug(f'Federated search for {query!r}: {len(result.results)} results, '
+                 f'latencies {result.latencies}, dropped {result.failed}')
+    return result
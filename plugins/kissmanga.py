@@ -1,9 +1,7 @@
 from typing import List, AsyncIterable
 from urllib.parse import urlparse, urljoin, quote_plus
 
-from bs4 import BeautifulSoup
-
-from plugins.client import MangaClient, MangaCard, MangaChapter, LastChapter
+from plugins.client import MangaClient, MangaCard, MangaChapter, LastChapter, html_soup
 
 
 class KissMangaClient(MangaClient):
@@ -20,7 +18,7 @@ class KissMangaClient(MangaClient):
         super().__init__(*args, name=name, headers=self.pre_headers, **kwargs)
 
     def mangas_from_page(self, page: bytes):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         cards = bs.findAll("div", {"class": "mainpage-manga"})
 
@@ -35,7 +33,7 @@ class KissMangaClient(MangaClient):
         return mangas
 
     def chapters_from_page(self, page: bytes, manga: MangaCard = None):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         ul = bs.findAll("div", {"class": "chapter-list"})[1]
 
@@ -52,7 +50,7 @@ class KissMangaClient(MangaClient):
 
     @staticmethod
     def updates_from_page(content):
-        bs = BeautifulSoup(content, "html.parser")
+        bs = html_soup(content)
 
         manga_items = bs.find_all("div", {"class": "media-body"})
 
@@ -71,7 +69,7 @@ class KissMangaClient(MangaClient):
         return urls
 
     async def pictures_from_chapters(self, content: bytes, response=None):
-        bs = BeautifulSoup(content, "html.parser")
+        bs = html_soup(content)
 
         ul = bs.find("p", {"id": "arraydata"})
 
@@ -89,15 +87,13 @@ class KissMangaClient(MangaClient):
 
         content = await self.get_url(request_url)
 
-        return self.mangas_from_page(content)
+        return await self.parse(self.mangas_from_page, content)
 
     async def get_chapters(self, manga_card: MangaCard, page: int = 1) -> List[MangaChapter]:
 
-        request_url = f'{manga_card.url}'
-
-        content = await self.get_url(request_url)
+        chapters = await self.chapter_list(manga_card)
 
-        return self.chapters_from_page(content, manga_card)[(page - 1) * 20:page * 20]
+        return chapters[(page - 1) * 20:page * 20]
 
     async def iter_chapters(self, manga_url: str, manga_name) -> AsyncIterable[MangaChapter]:
         manga_card = MangaCard(self, manga_name, manga_url, '')
@@ -106,7 +102,7 @@ class KissMangaClient(MangaClient):
 
         content = await self.get_url(request_url)
 
-        for chapter in self.chapters_from_page(content, manga_card):
+        for chapter in await self.parse(self.chapters_from_page, content, manga_card):
             yield chapter
 
     async def contains_url(self, url: str):
@@ -116,7 +112,7 @@ class KissMangaClient(MangaClient):
 
         content = await self.get_url(self.base_url.geturl())
 
-        updates = self.updates_from_page(content)
+        updates = await self.parse(self.updates_from_page, content)
 
         updated = [lc.url for lc in last_chapters if updates.get(lc.url) and updates.get(lc.url) != lc.chapter_url]
         not_updated = [lc.url for lc in last_chapters if
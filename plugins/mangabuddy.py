@@ -4,10 +4,8 @@ from dataclasses import dataclass
 from typing import List, AsyncIterable
 from urllib.parse import urlparse, urljoin, quote, quote_plus
 
-from bs4 import BeautifulSoup
-
 from models import LastChapter
-from plugins.client import MangaClient, MangaCard, MangaChapter
+from plugins.client import MangaClient, MangaCard, MangaChapter, html_soup, has_ancestor
 
 
 @dataclass
@@ -29,11 +27,13 @@ class MangaBuddyClient(MangaClient):
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:97.0) Gecko/20100101 Firefox/97.0'
     }
 
+    chapter_tag = 'li'
+
     def __init__(self, *args, name="MangaBuddy", **kwargs):
         super().__init__(*args, name=name, headers=self.pre_headers, **kwargs)
 
     def mangas_from_page(self, page: bytes):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         cards = bs.find_all("div", {"class": "book-item"})
 
@@ -48,7 +48,7 @@ class MangaBuddyClient(MangaClient):
         return mangas
 
     def chapters_from_page(self, page: bytes, manga: MangaCard = None):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         ul = bs.find('ul', {'id': 'chapter-list'})
 
@@ -60,8 +60,15 @@ class MangaBuddyClient(MangaClient):
 
         return list(map(lambda x: MangaChapter(self, x[0], x[1], manga, []), zip(texts, links)))
 
+    def chapter_from_element(self, li, manga: MangaCard = None):
+        a = li.find('.//a')
+        if a is None or not has_ancestor(li, 'ul', id='chapter-list'):
+            return None
+        text = a.find_class('chapter-title')[0].text_content().strip()
+        return MangaChapter(self, text, urljoin(self.base_url.geturl(), a.get('href')), manga, [])
+
     def updates_from_page(self, page: bytes):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         div = bs.find('div', {'class': 'container__left'})
 
@@ -102,15 +109,13 @@ class MangaBuddyClient(MangaClient):
 
         content = await self.get_url(request_url)
 
-        return self.mangas_from_page(content)[(page - 1) * 20:page * 20]
+        return (await self.parse(self.mangas_from_page, content))[(page - 1) * 20:page * 20]
 
     async def get_chapters(self, manga_card: MangaCard, page: int = 1) -> List[MangaChapter]:
 
-        request_url = f'{manga_card.url}'
-
-        content = await self.get_url(request_url)
+        chapters = await self.chapter_list(manga_card)
 
-        return self.chapters_from_page(content, manga_card)[(page - 1) * 20:page * 20]
+        return chapters[(page - 1) * 20:page * 20]
 
     async def iter_chapters(self, manga_url: str, manga_name) -> AsyncIterable[MangaChapter]:
         manga_card = MangaCard(self, manga_name, manga_url, '')
@@ -119,7 +124,7 @@ class MangaBuddyClient(MangaClient):
 
         content = await self.get_url(request_url)
 
-        for chapter in self.chapters_from_page(content, manga_card):
+        for chapter in self.iter_chapters_from_page(content, manga_card):
             yield chapter
 
     async def contains_url(self, url: str):
@@ -129,7 +134,7 @@ class MangaBuddyClient(MangaClient):
 
         content = await self.get_url(self.home_page)
 
-        updates = self.updates_from_page(content)
+        updates = await self.parse(self.updates_from_page, content)
 
         updated = [lc.url for lc in last_chapters if updates.get(lc.url) and updates.get(lc.url) != lc.chapter_url]
         not_updated = [lc.url for lc in last_chapters if not updates.get(lc.url)
@@ -1,9 +1,13 @@
 import json
+import re
+from collections import defaultdict
 from dataclasses import dataclass
-from typing import List, AsyncIterable
+from datetime import datetime, timezone, timedelta
+from typing import List, AsyncIterable, Dict, Set, Optional
 from urllib.parse import urlparse, urljoin, quote
 
 from plugins.client import MangaClient, MangaCard, MangaChapter, LastChapter
+from tools.ratelimit import RateLimit
 
 
 @dataclass
@@ -26,10 +30,21 @@ class MangaDexClient(MangaClient):
     base_url = urlparse("https://api.mangadex.org/")
     search_url = urljoin(base_url.geturl(), "manga")
     search_param = 'q'
-    latest_uploads = 'https://api.mangadex.org/chapter?limit=32&offset=0&includes[]=manga&contentRating[]=safe&contentRating[]=suggestive&contentRating[]=erotica&order[readableAt]=desc'
+    chapters_url = urljoin(base_url.geturl(), "chapter")
+    content_ratings = 'contentRating[]=safe&contentRating[]=suggestive&contentRating[]=erotica&contentRating[]=pornographic'
+
+    # Chapters updated since each manga's watermark are all listed, see check_updated_urls
+    complete_update_check = True
+    # Manga ids filtered in each request of the bulk update check
+    updates_batch = 100
+    # Uploads are looked up a bit before the last check, so clock skew or indexing lag does not hide any
+    updates_overlap = timedelta(minutes=5)
 
     covers_url = urlparse("https://uploads.mangadex.org/covers")
 
+    # Documented global limit of the MangaDex API
+    rate_limit = RateLimit(rate=5, burst=5)
+
     pre_headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:97.0) Gecko/20100101 Firefox/97.0'
     }
@@ -40,6 +55,10 @@ class MangaDexClient(MangaClient):
         super().__init__(*args, name=f'{name}-{language[0]}', headers=self.pre_headers, **kwargs)
         self.languages = language
         self.language_param = '&'.join([f'translatedLanguage[]={lang}' for lang in self.languages])
+        # Start of the last successful update check of every manga id, in the format of updatedAtSince
+        self.updates_watermarks: Dict[str, str] = dict()
+        # Watermarks of updated mangas, kept until their chapters are stored, see confirm_update_check
+        self.pending_watermarks: Dict[str, str] = dict()
 
     def mangas_from_page(self, page: bytes):
         dt = json.loads(page.decode())
@@ -107,7 +126,7 @@ class MangaDexClient(MangaClient):
 
         content = await self.get_url(request_url)
 
-        return self.mangas_from_page(content)
+        return await self.parse(self.mangas_from_page, content)
 
     async def get_chapters(self, manga_card: MangaCard, page: int = 1, count: int = 10) -> List[MangaChapter]:
 
@@ -119,7 +138,7 @@ class MangaDexClient(MangaClient):
 
         content = await self.get_url(request_url)
 
-        return self.chapters_from_page(content, manga_card)
+        return await self.parse(self.chapters_from_page, content, manga_card)
 
     async def iter_chapters(self, manga_url: str, manga_name) -> AsyncIterable[MangaChapter]:
         manga = MangaCard(self, manga_name, manga_url, '')
@@ -135,33 +154,78 @@ class MangaDexClient(MangaClient):
     async def contains_url(self, url: str):
         return url.startswith(self.base_url.geturl()) and url.endswith(self.language_param)
 
-    async def check_updated_urls(self, last_chapters: List[LastChapter]):
-
-        content = await self.get_url(f'{self.latest_uploads}&{self.language_param}')
-
-        data = json.loads(content)['data']
+    def url_patterns(self):
+        return [(self.base_url.geturl(), self.language_param)]
+
+    @staticmethod
+    def manga_id_from_url(url: str) -> Optional[str]:
+        match = re.search(r'/manga/([0-9a-f-]+)/feed', url)
+        return match.group(1) if match else None
+
+    @staticmethod
+    def chapter_id_from_url(url: str) -> Optional[str]:
+        match = re.search(r'/server/([0-9a-f-]+)', url)
+        return match.group(1) if match else None
+
+    async def updated_chapters(self, manga_ids: List[str], since: str) -> Dict[str, Set[str]]:
+        """Ids of the chapters of every manga in manga_ids that were uploaded or changed since the given time"""
+        updates = defaultdict(set)
+        for start in range(0, len(manga_ids), self.updates_batch):
+            mangas = '&'.join(f'manga[]={manga_id}' for manga_id in manga_ids[start:start + self.updates_batch])
+            offset = 0
+            while True:
+                request_url = f'{self.chapters_url}?limit=100&offset={offset}&{mangas}&{self.language_param}' \
+                              f'&updatedAtSince={since}&{self.content_ratings}&order[updatedAt]=asc'
+                dt = json.loads(await self.get_url(request_url))
+                for chapter in dt['data']:
+                    for rel in chapter['relationships']:
+                        if rel['type'] == 'manga':
+                            updates[rel['id']].add(chapter['id'])
+                offset += len(dt['data'])
+                if not dt['data'] or offset >= dt['total']:
+                    break
+        return updates
 
-        updates = {}
-        for item in data:
-            ch_id = item['id']
-            manga_id = None
-            for rel in item['relationships']:
-                if rel['type'] == 'manga':
-                    manga_id = rel['id']
-            if manga_id and not updates.get(manga_id):
-                updates[manga_id] = ch_id
+    async def check_updated_urls(self, last_chapters: List[LastChapter]):
+        sweep_start = (datetime.now(timezone.utc) - self.updates_overlap).strftime('%Y-%m-%dT%H:%M:%S')
 
         updated = []
         not_updated = []
 
+        by_manga: Dict[str, List[LastChapter]] = defaultdict(list)
         for lc in last_chapters:
-            upd = False
-            for manga_id, ch_id in updates.items():
-                if manga_id in lc.url and not ch_id in lc.chapter_url:
-                    upd = True
-                    updated.append(lc.url)
-                    break
-            if not upd:
-                not_updated.append(lc.url)
-
+            manga_id = self.manga_id_from_url(lc.url)
+            if manga_id in self.updates_watermarks:
+                by_manga[manga_id].append(lc)
+            else:
+                # Nothing to compare with yet, so the manga is checked on its own once
+                updated.append(lc.url)
+
+        if by_manga:
+            # Mangas are not all due at the same time, so the oldest watermark covers all of them.
+            # Chapters a manga already had by its own watermark only cost it one extra check.
+            since = min(self.updates_watermarks[manga_id] for manga_id in by_manga)
+            updates = await self.updated_chapters(list(by_manga), since)
+
+            for manga_id, manga_last_chapters in by_manga.items():
+                changed = updates.get(manga_id, set())
+                for lc in manga_last_chapters:
+                    if changed - {self.chapter_id_from_url(lc.chapter_url)}:
+                        updated.append(lc.url)
+                    else:
+                        not_updated.append(lc.url)
+
+        for url in not_updated:
+            # Nothing changed since the old watermark, so the new one loses nothing
+            self.updates_watermarks[self.manga_id_from_url(url)] = sweep_start
+        for url in updated:
+            manga_id = self.manga_id_from_url(url)
+            if manga_id:
+                # Only moves once the chapters are stored, a failed check asks again from the old watermark
+                self.pending_watermarks[manga_id] = sweep_start
         return updated, not_updated
+
+    def confirm_update_check(self, url: str):
+        manga_id = self.manga_id_from_url(url)
+        if manga_id in self.pending_watermarks:
+            self.updates_watermarks[manga_id] = self.pending_watermarks.pop(manga_id)
@@ -1,10 +1,8 @@
 from typing import List, AsyncIterable
 from urllib.parse import urlparse, urljoin, quote, quote_plus
 
-from bs4 import BeautifulSoup
-
 from models import LastChapter
-from plugins.client import MangaClient, MangaCard, MangaChapter
+from plugins.client import MangaClient, MangaCard, MangaChapter, html_soup, has_ancestor
 
 
 class MangaHasuClient(MangaClient):
@@ -16,11 +14,13 @@ class MangaHasuClient(MangaClient):
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:97.0) Gecko/20100101 Firefox/97.0'
     }
 
+    chapter_tag = 'tr'
+
     def __init__(self, *args, name="MangaHasu", **kwargs):
         super().__init__(*args, name=name, headers=self.pre_headers, **kwargs)
 
     def mangas_from_page(self, page: bytes):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         cards = bs.find_all("li")[:-1]
 
@@ -34,7 +34,7 @@ class MangaHasuClient(MangaClient):
         return mangas
 
     def chapters_from_page(self, page: bytes, manga: MangaCard = None):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         div = bs.find("div", {"class": "list-chapter"})
 
@@ -46,8 +46,16 @@ class MangaHasuClient(MangaClient):
 
         return list(map(lambda x: MangaChapter(self, x[0], x[1], manga, []), zip(texts, links)))
 
+    def chapter_from_element(self, tr, manga: MangaCard = None):
+        a = tr.find('.//a')
+        if a is None or not has_ancestor(tr, 'div', cls='list-chapter'):
+            return None
+        text = a.text_content()
+        text = (text if not text.startswith(manga.name) else text[len(manga.name):]).strip()
+        return MangaChapter(self, text, a.get('href'), manga, [])
+
     def updates_from_page(self, page: bytes):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         div = bs.find('div', {'class': 'st_content'})
 
@@ -70,7 +78,7 @@ class MangaHasuClient(MangaClient):
         return urls
 
     async def pictures_from_chapters(self, content: bytes, response=None):
-        bs = BeautifulSoup(content, "html.parser")
+        bs = html_soup(content)
 
         div = bs.find('div', {'class': 'img'})
 
@@ -89,15 +97,13 @@ class MangaHasuClient(MangaClient):
 
         content = await self.get_url(request_url, data=data, method='post')
 
-        return self.mangas_from_page(content)
+        return await self.parse(self.mangas_from_page, content)
 
     async def get_chapters(self, manga_card: MangaCard, page: int = 1) -> List[MangaChapter]:
 
-        request_url = f'{manga_card.url}'
-
-        content = await self.get_url(request_url)
+        chapters = await self.chapter_list(manga_card)
 
-        return self.chapters_from_page(content, manga_card)[(page - 1) * 20:page * 20]
+        return chapters[(page - 1) * 20:page * 20]
 
     async def iter_chapters(self, manga_url: str, manga_name) -> AsyncIterable[MangaChapter]:
         manga_card = MangaCard(self, manga_name, manga_url, '')
@@ -106,7 +112,7 @@ class MangaHasuClient(MangaClient):
 
         content = await self.get_url(request_url)
 
-        for chapter in self.chapters_from_page(content, manga_card):
+        for chapter in self.iter_chapters_from_page(content, manga_card):
             yield chapter
 
     async def contains_url(self, url: str):
@@ -116,7 +122,7 @@ class MangaHasuClient(MangaClient):
 
         content = await self.get_url(self.base_url.geturl())
 
-        updates = self.updates_from_page(content)
+        updates = await self.parse(self.updates_from_page, content)
 
         updated = [lc.url for lc in last_chapters if updates.get(lc.url) and updates.get(lc.url) != lc.chapter_url]
         not_updated = [lc.url for lc in last_chapters if not updates.get(lc.url)
@@ -3,10 +3,9 @@ from typing import List, AsyncIterable
 from urllib.parse import urlparse, urljoin, quote
 import re
 
-from bs4 import BeautifulSoup
 from bs4.element import PageElement
 
-from plugins.client import MangaClient, MangaCard, MangaChapter, LastChapter
+from plugins.client import MangaClient, MangaCard, MangaChapter, LastChapter, html_soup
 
 
 class ManganatoClient(MangaClient):
@@ -21,6 +20,8 @@ class ManganatoClient(MangaClient):
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:97.0) Gecko/20100101 Firefox/97.0'
     }
 
+    chapter_tag = 'li'
+
     def __init__(self, *args, name="Manganato", **kwargs):
         super().__init__(*args, name=name, headers=self.pre_headers, **kwargs)
 
@@ -45,7 +46,7 @@ class ManganatoClient(MangaClient):
         return mangas
 
     def chapters_from_page(self, page: bytes, manga: MangaCard = None):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         lis = bs.find_all("li", {"class": "a-h"})
 
@@ -56,8 +57,16 @@ class ManganatoClient(MangaClient):
 
         return list(map(lambda x: MangaChapter(self, x[0], x[1], manga, []), zip(texts, links)))
 
+    def chapter_from_element(self, li, manga: MangaCard = None):
+        if 'a-h' not in li.classes:
+            return None
+        a = li.find('.//a')
+        if a is None:
+            return None
+        return MangaChapter(self, a.text_content().strip(), a.get('href'), manga, [])
+
     def updates_from_page(self, page: bytes):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         manga_items: List[PageElement] = bs.find_all("div", {"class": "content-homepage-item"})
 
@@ -77,7 +86,7 @@ class ManganatoClient(MangaClient):
         return urls
 
     async def pictures_from_chapters(self, content: bytes, response=None):
-        bs = BeautifulSoup(content, "html.parser")
+        bs = html_soup(content)
 
         ul = bs.find("div", {"class": "container-chapter-reader"})
 
@@ -108,15 +117,13 @@ class ManganatoClient(MangaClient):
 
         content = await self.get_url(request_url, data=data, method='post')
 
-        return self.mangas_from_page(content)
+        return await self.parse(self.mangas_from_page, content)
 
     async def get_chapters(self, manga_card: MangaCard, page: int = 1) -> List[MangaChapter]:
 
-        request_url = f'{manga_card.url}'
-
-        content = await self.get_url(request_url)
+        chapters = await self.chapter_list(manga_card)
 
-        return self.chapters_from_page(content, manga_card)[(page - 1) * 20:page * 20]
+        return chapters[(page - 1) * 20:page * 20]
 
     async def iter_chapters(self, manga_url: str, manga_name) -> AsyncIterable[MangaChapter]:
         manga_card = MangaCard(self, manga_name, manga_url, '')
@@ -125,17 +132,20 @@ class ManganatoClient(MangaClient):
 
         content = await self.get_url(request_url)
 
-        for chapter in self.chapters_from_page(content, manga_card):
+        for chapter in self.iter_chapters_from_page(content, manga_card):
             yield chapter
 
     async def contains_url(self, url: str):
         return url.startswith(self.read_url) or url.startswith(self.base_url.geturl()) or url.startswith(self.chap_url)
 
+    def url_patterns(self):
+        return [(self.read_url, ''), (self.base_url.geturl(), ''), (self.chap_url, '')]
+
     async def check_updated_urls(self, last_chapters: List[LastChapter]):
 
         content = await self.get_url(self.base_url.geturl())
 
-        updates = self.updates_from_page(content)
+        updates = await self.parse(self.updates_from_page, content)
 
         updated = [lc.url for lc in last_chapters if updates.get(lc.url) and updates.get(lc.url) != lc.chapter_url]
         not_updated = [lc.url for lc in last_chapters if not updates.get(lc.url)
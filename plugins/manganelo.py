@@ -1,9 +1,7 @@
 from typing import List, AsyncIterable
 from urllib.parse import urlparse, urljoin, quote
 
-from bs4 import BeautifulSoup
-
-from plugins.client import MangaClient, MangaCard, MangaChapter, LastChapter
+from plugins.client import MangaClient, MangaCard, MangaChapter, LastChapter, html_soup
 
 
 class ManganeloClient(MangaClient):
@@ -17,11 +15,13 @@ class ManganeloClient(MangaClient):
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:97.0) Gecko/20100101 Firefox/97.0'
     }
 
+    chapter_tag = 'li'
+
     def __init__(self, *args, name="Manganelo", **kwargs):
         super().__init__(*args, name=name, headers=self.pre_headers, **kwargs)
 
     def mangas_from_page(self, page: bytes):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         cards = bs.find_all("div", {"class": "search-story-item"})
 
@@ -35,7 +35,7 @@ class ManganeloClient(MangaClient):
         return mangas
 
     def chapters_from_page(self, page: bytes, manga: MangaCard = None):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         lis = bs.find_all("li", {"class": "a-h"})
 
@@ -46,8 +46,16 @@ class ManganeloClient(MangaClient):
 
         return list(map(lambda x: MangaChapter(self, x[0], x[1], manga, []), zip(texts, links)))
 
+    def chapter_from_element(self, li, manga: MangaCard = None):
+        if 'a-h' not in li.classes:
+            return None
+        a = li.find('.//a')
+        if a is None:
+            return None
+        return MangaChapter(self, a.text_content(), a.get('href'), manga, [])
+
     def updates_from_page(self, content):
-        bs = BeautifulSoup(content, "html.parser")
+        bs = html_soup(content)
 
         manga_items = bs.find_all("div", {"class": "content-genres-item"})
 
@@ -66,7 +74,7 @@ class ManganeloClient(MangaClient):
         return urls
 
     async def pictures_from_chapters(self, content: bytes, response=None):
-        bs = BeautifulSoup(content, "html.parser")
+        bs = html_soup(content)
 
         ul = bs.find("div", {"class": "container-chapter-reader"})
 
@@ -86,15 +94,13 @@ class ManganeloClient(MangaClient):
 
         content = await self.get_url(request_url)
 
-        return self.mangas_from_page(content)
+        return await self.parse(self.mangas_from_page, content)
 
     async def get_chapters(self, manga_card: MangaCard, page: int = 1) -> List[MangaChapter]:
 
-        request_url = f'{manga_card.url}'
+        chapters = await self.chapter_list(manga_card)
 
-        content = await self.get_url(request_url)
-
-        return self.chapters_from_page(content, manga_card)[(page - 1) * 20:page * 20]
+        return chapters[(page - 1) * 20:page * 20]
 
     async def iter_chapters(self, manga_url: str, manga_name) -> AsyncIterable[MangaChapter]:
         manga_card = MangaCard(self, manga_name, manga_url, '')
@@ -103,7 +109,7 @@ class ManganeloClient(MangaClient):
 
         content = await self.get_url(request_url)
 
-        for chapter in self.chapters_from_page(content, manga_card):
+        for chapter in self.iter_chapters_from_page(content, manga_card):
             yield chapter
 
     def get_picture(self, manga_chapter: MangaChapter, url, *args, **kwargs):
@@ -115,11 +121,14 @@ class ManganeloClient(MangaClient):
     async def contains_url(self, url: str):
         return url.startswith(self.base_url.geturl()) or url.startswith(self.chapter_url)
 
+    def url_patterns(self):
+        return [(self.base_url.geturl(), ''), (self.chapter_url, '')]
+
     async def check_updated_urls(self, last_chapters: List[LastChapter]):
 
         content = await self.get_url(self.updates_url)
 
-        updates = self.updates_from_page(content)
+        updates = await self.parse(self.updates_from_page, content)
 
         updated = [lc.url for lc in last_chapters if updates.get(lc.url) and updates.get(lc.url) != lc.chapter_url]
         not_updated = [lc.url for lc in last_chapters if
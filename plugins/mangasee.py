@@ -1,10 +1,14 @@
+import asyncio
 import json
-import re
 from typing import List, AsyncIterable
 from urllib.parse import urlparse, urljoin, quote_plus
 
+from loguru import logger
+
 from plugins.client import MangaClient, MangaCard, MangaChapter, LastChapter
-from .search_engine import search
+from .extractor import ScriptExtractor
+from .search_engine import SearchIndex
+from tools.parsepool import parse_pool
 
 
 class MangaSeeClient(MangaClient):
@@ -18,8 +22,53 @@ class MangaSeeClient(MangaClient):
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:97.0) Gecko/20100101 Firefox/97.0'
     }
 
+    # Seconds between downloads of the whole site directory
+    directory_refresh = 6 * 60 * 60
+
+    # Script variables read from the manga, home and reader pages
+    chapter_variables = ScriptExtractor('vm', ('IndexName', 'Chapters'))
+    latest_variables = ScriptExtractor('vm', ('LatestJSON',))
+    reader_variables = ScriptExtractor('vm', ('CurChapter', 'CurPathName', 'IndexName'))
+
     def __init__(self, *args, name="Mangasee", **kwargs):
         super().__init__(*args, name=name, headers=self.pre_headers, **kwargs)
+        self.directory: SearchIndex = None
+        self.directory_task: asyncio.Task = None
+
+    @staticmethod
+    def text_from_document(doc) -> str:
+        return doc['s'] + ' ' + ' '.join(doc['a'])
+
+    @staticmethod
+    def title_from_document(doc) -> str:
+        return doc['i']
+
+    @classmethod
+    def directory_from_page(cls, content: bytes) -> SearchIndex:
+        documents = json.loads(content)
+        return SearchIndex(documents, cls.title_from_document, cls.text_from_document)
+
+    async def load_directory(self):
+        content = await self.get_url(self.search_url, method="post")
+
+        # Decoding and indexing the whole site takes seconds, the old index keeps serving searches meanwhile
+        self.directory = await parse_pool.run_heavy(self.directory_from_page, content)
+        logger.debug(f'{self.name} directory loaded with {len(self.directory)} mangas')
+
+    async def refresh_directory(self):
+        while True:
+            await asyncio.sleep(self.directory_refresh)
+            try:
+                await self.load_directory()
+            except Exception as e:
+                logger.exception(f'Error refreshing {self.name} directory, keeping the old one: {e}')
+
+    async def get_directory(self) -> SearchIndex:
+        if self.directory is None:
+            await self.inflight.do('directory', self.load_directory)
+        if self.directory_task is None:
+            self.directory_task = asyncio.create_task(self.refresh_directory())
+        return self.directory
 
     def mangas_from_page(self, documents: List):
         names = [doc['s'] for doc in documents]
@@ -50,43 +99,33 @@ class MangaSeeClient(MangaClient):
         return t if n == '0' else str(t) + "." + n
 
     def chapters_from_page(self, page: bytes, manga: MangaCard = None):
+        return list(self.iter_chapters_from_page(page, manga))
 
-        chap_pat = re.compile('vm.Chapters = ([\s\S]*?);')
-        chapters_str_list = chap_pat.findall(page.decode())
-        if not chapters_str_list:
-            return []
+    def iter_chapters_from_page(self, page: bytes, manga: MangaCard = None):
+        variables = self.chapter_variables.extract(page)
+        if 'Chapters' not in variables or 'IndexName' not in variables:
+            return
 
-        chapter_list = json.loads(chapters_str_list[0])
+        index_str = variables['IndexName']
 
-        index_pat = re.compile('vm.IndexName = ([\s\S]*?);')
-        index_str_list = index_pat.findall(page.decode())
-        if not index_str_list:
-            return []
-
-        index_str = json.loads(index_str_list[0])
-
-        for ch in chapter_list:
+        # Chapters are decoded one at a time, so stopping at a known chapter skips the rest of the list
+        for ch in variables.iter_array('Chapters'):
             if not ch.get('Type'):
                 ch['Type'] = 'Chapter'
-
-        links = [f"{self.chapter_url}/{index_str}{self.chapter_url_encode(ch)}" for ch in chapter_list]
-        texts = [f"{ch.get('Type')} {self.chapter_display(ch)}" for ch in chapter_list]
-
-        return list(map(lambda x: MangaChapter(self, x[0], x[1], manga, []), zip(texts, links)))
+            link = f"{self.chapter_url}/{index_str}{self.chapter_url_encode(ch)}"
+            yield MangaChapter(self, f"{ch.get('Type')} {self.chapter_display(ch)}", link, manga, [])
 
     def updates_from_page(self, page: bytes):
-
-        chap_pat = re.compile(r'vm.LatestJSON = (\[[\s\S]*?]);')
-        chapters_str_list = chap_pat.findall(page.decode())
-        if not chapters_str_list:
+        variables = self.latest_variables.extract(page)
+        if 'LatestJSON' not in variables:
             return []
 
-        chapter_list = json.loads(chapters_str_list[0])
+        chapter_list = variables['LatestJSON'][:32]
 
         urls = [f"{self.manga_url}/{ch['IndexName']}" for ch in chapter_list]
         chapter_urls = [f"{self.chapter_url}/{ch['IndexName']}{self.chapter_url_encode(ch)}" for ch in chapter_list]
 
-        urls = dict(zip(urls[:32], chapter_urls[:32]))
+        urls = dict(zip(urls, chapter_urls))
 
         return urls
 
@@ -103,27 +142,13 @@ class MangaSeeClient(MangaClient):
         return s[-3:]
 
     async def pictures_from_chapters(self, content: bytes, response=None):
-
-        chap_pat = re.compile('vm.CurChapter = ([\s\S]*?);')
-        chap_str_list = chap_pat.findall(content.decode())
-        if not chap_str_list:
+        variables = self.reader_variables.extract(content)
+        if not all(name in variables for name in self.reader_variables.names):
             return []
 
-        curChapter = json.loads(chap_str_list[0])
-
-        path_pat = re.compile('vm.CurPathName = ([\s\S]*?);')
-        path_str_list = path_pat.findall(content.decode())
-        if not path_str_list:
-            return []
-
-        curPath = json.loads(path_str_list[0])
-
-        index_pat = re.compile('vm.IndexName = ([\s\S]*?);')
-        index_str_list = index_pat.findall(content.decode())
-        if not index_str_list:
-            return []
-
-        index_str = json.loads(index_str_list[0])
+        curChapter = variables['CurChapter']
+        curPath = variables['CurPathName']
+        index_str = variables['IndexName']
 
         pages = list(range(1, int(curChapter['Page']) + 1))
 
@@ -134,29 +159,17 @@ class MangaSeeClient(MangaClient):
         return images_url
 
     async def search(self, query: str = "", page: int = 1) -> List[MangaCard]:
-        def text_from_document(doc) -> str:
-            return doc['s'] + ' ' + ' '.join(doc['a'])
-
-        def title_from_document(doc) -> str:
-            return doc['i']
+        directory = await self.get_directory()
 
-        request_url = self.search_url
-
-        content = await self.get_url(request_url, method="post")
-
-        documents = json.loads(content)
-
-        results = search(query, documents, title_from_document, text_from_document)[(page - 1) * 20:page * 20]
+        results = directory.top_k(query, page * 20)[(page - 1) * 20:]
 
         return self.mangas_from_page(results)
 
     async def get_chapters(self, manga_card: MangaCard, page: int = 1) -> List[MangaChapter]:
 
-        request_url = f'{manga_card.url}'
-
-        content = await self.get_url(request_url)
+        chapters = await self.chapter_list(manga_card)
 
-        return self.chapters_from_page(content, manga_card)[(page - 1) * 20:page * 20]
+        return chapters[(page - 1) * 20:page * 20]
 
     async def iter_chapters(self, manga_url: str, manga_name) -> AsyncIterable[MangaChapter]:
 
@@ -166,7 +179,7 @@ class MangaSeeClient(MangaClient):
 
         content = await self.get_url(request_url)
 
-        for ch in self.chapters_from_page(content, manga_card):
+        for ch in self.iter_chapters_from_page(content, manga_card):
             yield ch
 
     async def contains_url(self, url: str):
@@ -176,7 +189,7 @@ class MangaSeeClient(MangaClient):
 
         content = await self.get_url(self.base_url.geturl())
 
-        updates = self.updates_from_page(content)
+        updates = await self.parse(self.updates_from_page, content)
 
         updated = [lc.url for lc in last_chapters if updates.get(lc.url) and updates.get(lc.url) != lc.chapter_url]
         not_updated = [lc.url for lc in last_chapters if
@@ -4,10 +4,9 @@ import json
 from urllib.parse import urlparse, urljoin, quote, quote_plus
 from dataclasses import dataclass
 
-from bs4 import BeautifulSoup
 from bs4.element import PageElement
 
-from plugins.client import MangaClient, MangaCard, MangaChapter
+from plugins.client import MangaClient, MangaCard, MangaChapter, html_soup
 from models import LastChapter
 
 @dataclass
@@ -71,7 +70,7 @@ class MangasInClient(MangaClient):
         return list(map(lambda x: MangaChapter(self, x[0], x[1], manga, []), zip(texts, links)))
 
     def updates_from_page(self, page: bytes):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         manga_items: List[PageElement] = bs.find_all("div", {"class": "manga-item"})
 
@@ -89,7 +88,7 @@ class MangasInClient(MangaClient):
         return urls
 
     async def pictures_from_chapters(self, content: bytes, response=None):
-        bs = BeautifulSoup(content, "html.parser")
+        bs = html_soup(content)
 
         ul = bs.find("div", {"id": "all"})
 
@@ -110,7 +109,7 @@ class MangasInClient(MangaClient):
 
         content = await self.get_url(request_url)
 
-        return self.mangas_from_page(content)[(page - 1) * 10:page * 10]
+        return (await self.parse(self.mangas_from_page, content))[(page - 1) * 10:page * 10]
 
     async def get_chapters(self, manga_card: MangaCard, page: int = 1) -> List[MangaChapter]:
 
@@ -118,7 +117,7 @@ class MangasInClient(MangaClient):
 
         content = await self.get_url(request_url)
 
-        return self.chapters_from_page(content, manga_card)[(page - 1) * 10:page * 10]
+        return (await self.parse(self.chapters_from_page, content, manga_card))[(page - 1) * 10:page * 10]
 
     async def iter_chapters(self, manga_url: str, manga_name) -> AsyncIterable[MangaChapter]:
         manga = MangaCard(self, manga_name, manga_url, '')
@@ -127,7 +126,7 @@ class MangasInClient(MangaClient):
 
         content = await self.get_url(request_url)
 
-        for chapter in self.chapters_from_page(content, manga):
+        for chapter in await self.parse(self.chapters_from_page, content, manga):
             yield chapter
 
     async def contains_url(self, url: str):
@@ -137,7 +136,7 @@ class MangasInClient(MangaClient):
 
         content = await self.get_url(self.base_url.geturl())
 
-        updates = self.updates_from_page(content)
+        updates = await self.parse(self.updates_from_page, content)
 
         updated = [lc.url for lc in last_chapters if updates.get(lc.url) and updates.get(lc.url) != lc.chapter_url]
         not_updated = [lc.url for lc in last_chapters if not updates.get(lc.url) or updates.get(lc.url) == lc.chapter_url]
@@ -3,10 +3,9 @@ from typing import List, AsyncIterable
 from urllib.parse import urlparse, urljoin, quote, quote_plus
 
 from aiohttp import ClientResponse
-from bs4 import BeautifulSoup
 from bs4.element import PageElement
 
-from plugins.client import MangaClient, MangaCard, MangaChapter, LastChapter
+from plugins.client import MangaClient, MangaCard, MangaChapter, LastChapter, chapters_cache, html_soup
 
 
 class MangatigreClient(MangaClient):
@@ -38,7 +37,7 @@ class MangatigreClient(MangaClient):
         return mangas
 
     def chapters_from_page(self, page: bytes, manga: MangaCard = None):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         ul = bs.find('ul', {'class': 'list-unstyled'})
         lis = ul.find_all("li")
@@ -51,7 +50,7 @@ class MangatigreClient(MangaClient):
         return list(map(lambda x: MangaChapter(self, x[0], x[1], manga, []), zip(texts, links)))
 
     def updates_from_page(self, page: bytes):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         manga_items: List[PageElement] = bs.find_all("article", {"class": "chapter-block"})
 
@@ -69,7 +68,7 @@ class MangatigreClient(MangaClient):
         return urls
 
     async def pictures_from_chapters(self, content: bytes, response: ClientResponse = None):
-        bs = BeautifulSoup(content, "html.parser")
+        bs = html_soup(content)
 
         btn = bs.find('button', {'data-read-type': 2})
         if btn:
@@ -82,7 +81,7 @@ class MangatigreClient(MangaClient):
             }
 
             content = await self.get_url(f'{response.url}/read-type', data=data, method='post')
-            bs = BeautifulSoup(content, "html.parser")
+            bs = html_soup(content)
 
         ul = bs.find("div", {"class": "display-zone"})
 
@@ -96,7 +95,7 @@ class MangatigreClient(MangaClient):
     async def search(self, query: str = "", page: int = 1) -> List[MangaCard]:
         main_page = await self.get_url(self.base_url.geturl())
 
-        bs = BeautifulSoup(main_page, "html.parser")
+        bs = html_soup(main_page)
         div = bs.find('div', {'class': 'input-group'})
         token = div.find('input').get('data-csrf')
 
@@ -109,10 +108,13 @@ class MangatigreClient(MangaClient):
 
         content = await self.get_url(request_url, data=data, method='post')
 
-        return self.mangas_from_page(content)[(page - 1) * 20:page * 20]
+        return (await self.parse(self.mangas_from_page, content))[(page - 1) * 20:page * 20]
 
     async def get_chapters(self, manga_card: MangaCard, page: int = 1) -> List[MangaChapter]:
-        chapters = [x async for x in self.iter_chapters(manga_card.url, manga_card.name)]
+        async def fetch():
+            return [x async for x in self.iter_chapters(manga_card.url, manga_card.name)]
+
+        chapters = await chapters_cache.get_or_set(manga_card.url, fetch)
         return chapters[(page - 1) * 20:page * 20]
 
     async def iter_chapters(self, manga_url: str, manga_name) -> AsyncIterable[MangaChapter]:
@@ -122,7 +124,7 @@ class MangatigreClient(MangaClient):
 
         chapter_page = await self.get_url(request_url)
 
-        bs = BeautifulSoup(chapter_page, "html.parser")
+        bs = html_soup(chapter_page)
         btn = bs.find('button', {'class': 'btn-load-more-chapters'})
         token = btn.get('data-token')
 
@@ -130,7 +132,7 @@ class MangatigreClient(MangaClient):
 
         content = await self.get_url(request_url, data=data, method='post')
 
-        chapters = self.chapters_from_page(content, manga_card)
+        chapters = await self.parse(self.chapters_from_page, content, manga_card)
 
         for chapter in chapters:
             yield chapter
@@ -142,7 +144,7 @@ class MangatigreClient(MangaClient):
 
         content = await self.get_url(self.base_url.geturl())
 
-        updates = self.updates_from_page(content)
+        updates = await self.parse(self.updates_from_page, content)
 
         updated = [lc.url for lc in last_chapters if updates.get(lc.url) and updates.get(lc.url) != lc.chapter_url]
         not_updated = [lc.url for lc in last_chapters if not updates.get(lc.url) or updates.get(lc.url) == lc.chapter_url]
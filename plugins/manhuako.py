@@ -1,10 +1,9 @@
 from typing import List, AsyncIterable
 from urllib.parse import urlparse, urljoin, quote, quote_plus
 
-from bs4 import BeautifulSoup
 from bs4.element import PageElement
 
-from plugins.client import MangaClient, MangaCard, MangaChapter, LastChapter
+from plugins.client import MangaClient, MangaCard, MangaChapter, LastChapter, html_soup
 
 
 class ManhuaKoClient(MangaClient):
@@ -21,7 +20,7 @@ class ManhuaKoClient(MangaClient):
         super().__init__(*args, name=name, headers=self.pre_headers, **kwargs)
 
     def mangas_from_page(self, page: bytes):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         cards = bs.find_all("div", {"class": "card"})
 
@@ -38,7 +37,7 @@ class ManhuaKoClient(MangaClient):
         return mangas
 
     def chapters_from_page(self, page: bytes, manga: MangaCard = None):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         table = bs.find("table", {"class": "table-chapters"})
         trs = table.find_all('tr')
@@ -52,7 +51,7 @@ class ManhuaKoClient(MangaClient):
 
     @staticmethod
     def updates_from_page(content):
-        bs = BeautifulSoup(content, "html.parser")
+        bs = html_soup(content)
 
         manga_items = bs.find_all("div", {"class": "card"})
 
@@ -71,7 +70,7 @@ class ManhuaKoClient(MangaClient):
         return urls
 
     async def pictures_from_chapters(self, content: bytes, response=None):
-        bs = BeautifulSoup(content, "html.parser")
+        bs = html_soup(content)
 
         ul = bs.find("div", {"id": "pantallaCompleta"})
 
@@ -91,7 +90,7 @@ class ManhuaKoClient(MangaClient):
 
         content = await self.get_url(request_url)
 
-        return self.mangas_from_page(content)
+        return await self.parse(self.mangas_from_page, content)
 
     async def get_chapters(self, manga_card: MangaCard, page: int = 1) -> List[MangaChapter]:
 
@@ -99,7 +98,7 @@ class ManhuaKoClient(MangaClient):
 
         content = await self.get_url(request_url)
 
-        return self.chapters_from_page(content, manga_card)
+        return await self.parse(self.chapters_from_page, content, manga_card)
 
     async def iter_chapters(self, manga_url: str, manga_name) -> AsyncIterable[MangaChapter]:
         manga = MangaCard(self, manga_name, manga_url, '')
@@ -119,7 +118,7 @@ class ManhuaKoClient(MangaClient):
 
         content = await self.get_url(self.base_url.geturl())
 
-        updates = self.updates_from_page(content)
+        updates = await self.parse(self.updates_from_page, content)
 
         updated = [lc.url for lc in last_chapters if updates.get(lc.url) and updates.get(lc.url) != lc.chapter_url]
         not_updated = [lc.url for lc in last_chapters if
@@ -3,10 +3,9 @@ from urllib.parse import urlparse, urljoin, quote, quote_plus
 import json
 import re
 
-from bs4 import BeautifulSoup
 from bs4.element import PageElement
 
-from plugins.client import MangaClient, MangaCard, MangaChapter, LastChapter
+from plugins.client import MangaClient, MangaCard, MangaChapter, LastChapter, html_soup, has_ancestor
 
 
 class McReaderClient(MangaClient):
@@ -23,6 +22,8 @@ class McReaderClient(MangaClient):
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:97.0) Gecko/20100101 Firefox/97.0'
     }
 
+    chapter_tag = 'li'
+
     def __init__(self, *args, name="McReader", **kwargs):
         super().__init__(*args, name=name, headers=self.pre_headers, **kwargs)
 
@@ -39,7 +40,7 @@ class McReaderClient(MangaClient):
         return mangas
 
     def chapters_from_page(self, page: bytes, manga: MangaCard = None):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         ul = bs.find('ul', {'class': 'chapter-list'})
 
@@ -52,8 +53,16 @@ class McReaderClient(MangaClient):
 
         return list(map(lambda x: MangaChapter(self, x[0], x[1], manga, []), zip(texts, links)))
 
+    def chapter_from_element(self, li, manga: MangaCard = None):
+        a = li.find('.//a')
+        if a is None or not has_ancestor(li, 'ul', cls='chapter-list'):
+            return None
+        title = a.find_class('chapter-title')[0].text_content()
+        text = title.strip().split('-eng')[0].replace('-', '.')
+        return MangaChapter(self, text, urljoin(self.base_url.geturl(), a.get('href')), manga, [])
+
     def updates_from_page(self, page: bytes):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         ul = bs.find('ul', {'class': 'novel-list'})
 
@@ -79,7 +88,7 @@ class McReaderClient(MangaClient):
         return urls
 
     async def pictures_from_chapters(self, content: bytes, response=None):
-        bs = BeautifulSoup(content, "html.parser")
+        bs = html_soup(content)
 
         ul = bs.find("div", {"id": "chapter-reader"})
 
@@ -99,15 +108,15 @@ class McReaderClient(MangaClient):
 
         content = await self.get_url(request_url)
 
-        return self.mangas_from_page(content)[(page - 1) * 15:page * 15]
+        return (await self.parse(self.mangas_from_page, content))[(page - 1) * 15:page * 15]
 
     async def get_chapters(self, manga_card: MangaCard, page: int = 1) -> List[MangaChapter]:
 
         request_url = f'{manga_card.url}/{self.chapters}'
 
-        content = await self.get_url(request_url)
+        chapters = await self.chapter_list(manga_card, request_url)
 
-        return self.chapters_from_page(content, manga_card)[(page - 1) * 20:page * 20]
+        return chapters[(page - 1) * 20:page * 20]
 
     async def iter_chapters(self, manga_url: str, manga_name) -> AsyncIterable[MangaChapter]:
         manga_card = MangaCard(self, manga_name, manga_url, '')
@@ -116,7 +125,7 @@ class McReaderClient(MangaClient):
 
         content = await self.get_url(request_url)
 
-        for chapter in self.chapters_from_page(content, manga_card):
+        for chapter in self.iter_chapters_from_page(content, manga_card):
             yield chapter
 
     async def contains_url(self, url: str):
@@ -129,7 +138,7 @@ class McReaderClient(MangaClient):
 
         content = await self.get_url(self.latest_uploads)
 
-        updates = self.updates_from_page(content)
+        updates = await self.parse(self.updates_from_page, content)
 
         updated = [lc.url for lc in last_chapters if updates.get(lc.url) and updates.get(lc.url) != self.number_from_url(lc.chapter_url)]
         not_updated = [lc.url for lc in last_chapters if not updates.get(lc.url) or updates.get(lc.url) == self.number_from_url(lc.chapter_url)]
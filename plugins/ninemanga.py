@@ -3,9 +3,8 @@ from urllib.parse import urlparse, urljoin, quote, quote_plus
 
 import aiohttp.http
 from aiohttp import ClientResponse
-from bs4 import BeautifulSoup
 
-from plugins.client import MangaClient, MangaCard, MangaChapter, LastChapter
+from plugins.client import MangaClient, MangaCard, MangaChapter, LastChapter, html_soup, has_ancestor
 
 
 class NineMangaClient(MangaClient):
@@ -19,6 +18,8 @@ class NineMangaClient(MangaClient):
         'Accept-Language': 'en-US,en;q=0.5',
     }
 
+    chapter_tag = 'li'
+
     def __init__(self, *args, name="NineManga", language=None, **kwargs):
         if language is None:
             language = 'en'
@@ -29,7 +30,7 @@ class NineMangaClient(MangaClient):
         super().__init__(*args, name=name, headers=self.pre_headers, **kwargs)
 
     def mangas_from_page(self, page: bytes):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         container = bs.find("ul", {"class": "direlist"})
 
@@ -45,7 +46,7 @@ class NineMangaClient(MangaClient):
         return mangas
 
     def chapters_from_page(self, page: bytes, manga: MangaCard = None):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         container = bs.find("div", {"class": "chapterbox"})
 
@@ -58,8 +59,14 @@ class NineMangaClient(MangaClient):
 
         return list(map(lambda x: MangaChapter(self, x[0], x[1], manga, []), zip(texts, links)))
 
+    def chapter_from_element(self, li, manga: MangaCard = None):
+        a = li.find('.//a')
+        if a is None or not has_ancestor(li, 'div', cls='chapterbox'):
+            return None
+        return MangaChapter(self, a.get('title').strip(), a.get('href'), manga, [])
+
     def updates_from_page(self, content):
-        bs = BeautifulSoup(content, "html.parser")
+        bs = html_soup(content)
 
         container = bs.find("ul", {"class": "homeupdate"})
 
@@ -79,8 +86,8 @@ class NineMangaClient(MangaClient):
 
         return urls
 
-    async def pictures_from_chapters(self, content: bytes, response: Optional[ClientResponse] = None):
-        bs = BeautifulSoup(content, "html.parser")
+    def reader_pages(self, content: bytes, response: Optional[ClientResponse] = None):
+        bs = html_soup(content)
 
         container = bs.find("select", {"id": "page"})
 
@@ -90,14 +97,14 @@ class NineMangaClient(MangaClient):
         total = len(options)
         pages = (total - 1) // count
 
-        images_url = []
-        for page in range(pages):
-            url = f'{str(response.url)[:-5]}-{count}-{(page + 1)}.html'
-            content = await self.get_url(url)
-            bs = BeautifulSoup(content, "html.parser")
-            images_url += [img.get("src") for img in bs.find_all("img", {"class": "manga_pic"})]
+        return [f'{str(response.url)[:-5]}-{count}-{(page + 1)}.html' for page in range(pages)]
 
-        return images_url
+    def pictures_from_reader_page(self, content: bytes):
+        bs = html_soup(content)
+        return [img.get("src") for img in bs.find_all("img", {"class": "manga_pic"})]
+
+    async def pictures_from_chapters(self, content: bytes, response: Optional[ClientResponse] = None):
+        return [picture async for picture in self.iter_pictures(content, response)]
 
     async def search(self, query: str = "", page: int = 1) -> List[MangaCard]:
         query = quote_plus(query)
@@ -109,15 +116,15 @@ class NineMangaClient(MangaClient):
 
         content = await self.get_url(request_url)
 
-        return self.mangas_from_page(content)
+        return await self.parse(self.mangas_from_page, content)
 
     async def get_chapters(self, manga_card: MangaCard, page: int = 1) -> List[MangaChapter]:
 
         request_url = f'{manga_card.url}?{self.query_param}'
 
-        content = await self.get_url(request_url)
+        chapters = await self.chapter_list(manga_card, request_url)
 
-        return self.chapters_from_page(content, manga_card)[(page - 1) * 20:page * 20]
+        return chapters[(page - 1) * 20:page * 20]
 
     async def iter_chapters(self, manga_url: str, manga_name) -> AsyncIterable[MangaChapter]:
         manga_card = MangaCard(self, manga_name, manga_url, '')
@@ -126,7 +133,7 @@ class NineMangaClient(MangaClient):
 
         content = await self.get_url(request_url)
 
-        for chapter in self.chapters_from_page(content, manga_card):
+        for chapter in self.iter_chapters_from_page(content, manga_card):
             yield chapter
 
     async def contains_url(self, url: str):
@@ -144,7 +151,7 @@ class NineMangaClient(MangaClient):
 
         content = await self.get_url(self.updates_url)
 
-        updates = self.updates_from_page(content)
+        updates = await self.parse(self.updates_from_page, content)
 
         updated = [lc.url for lc in last_chapters if updates.get(lc.url) and
                    self.get_chapter_number_from_url(updates.get(lc.url)) != self.get_chapter_number_from_url(lc.chapter_url)]
@@ -0,0 +1,67 @@
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from plugins.client import MangaClient
+
+
+def url_key(url: str) -> List[str]:
+    """Scheme and host first, then every path segment, so urls that share a prefix share a trie branch"""
+    parts = urlsplit(url)
+    return [f'{parts.scheme}://{parts.netloc}'] + [segment for segment in parts.path.split('/') if segment]
+
+
+class RouteNode:
+    __slots__ = ('children', 'routes')
+
+    def __init__(self):
+        self.children: Dict[str, RouteNode] = dict()
+        # (prefix, suffix, identifier) of the plugins whose prefix ends at this node
+        self.routes: List[Tuple[str, str, str]] = []
+
+
+class PluginRouter:
+    """
+    Finds the plugin a manga url belongs to without asking every plugin.
+
+    Each plugin declares the (prefix, suffix) pairs of its urls in url_patterns. Prefixes are kept in a trie by
+    host and path segment, a lookup walks the url down the trie and the deepest prefix with a matching suffix wins,
+    so MangaDex urls of different languages are told apart by their language parameters.
+    """
+
+    def __init__(self, plugins: Dict[str, MangaClient] = None):
+        self.root = RouteNode()
+        if plugins:
+            self.build(plugins)
+
+    def build(self, plugins: Dict[str, MangaClient]):
+        self.root = RouteNode()
+        for identifier, client in plugins.items():
+            for prefix, suffix in client.url_patterns():
+                node = self.root
+                for key in url_key(prefix):
+                    node = node.children.setdefault(key, RouteNode())
+                node.routes.append((prefix, suffix, identifier))
+        for node in self.nodes():
+            # Longer suffixes are more specific, an empty one is the fallback
+            node.routes.sort(key=lambda route: len(route[1]), reverse=True)
+
+    def nodes(self):
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(node.children.values())
+
+    def resolve(self, url: str) -> Optional[str]:
+        """Identifier of the plugin that owns url, None if no plugin does"""
+        found = None
+        node = self.root
+        for key in url_key(url):
+            node = node.children.get(key)
+            if node is None:
+                break
+            for prefix, suffix, identifier in node.routes:
+                if url.startswith(prefix) and url.endswith(suffix):
+                    found = identifier
+                    break
+        return found
@@ -1,11 +1,10 @@
-from typing import List, AsyncIterable
+from typing import List, AsyncIterable, Optional
 from urllib.parse import urlparse, urljoin, quote, quote_plus
 
 import aiohttp
-from bs4 import BeautifulSoup
 
 from models import LastChapter
-from plugins.client import MangaClient, MangaCard, MangaChapter
+from plugins.client import MangaClient, MangaCard, MangaChapter, html_soup, has_ancestor
 
 
 class TMOClient(MangaClient):
@@ -18,11 +17,13 @@ class TMOClient(MangaClient):
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:97.0) Gecko/20100101 Firefox/97.0'
     }
 
+    chapter_tag = 'li'
+
     def __init__(self, *args, name="TMO", **kwargs):
         super().__init__(*args, name=name, headers=self.pre_headers, connector=aiohttp.TCPConnector(verify_ssl=False), **kwargs)
 
     def mangas_from_page(self, page: bytes):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         cards = bs.find_all("div", {"class": "element"})
 
@@ -37,7 +38,7 @@ class TMOClient(MangaClient):
         return mangas
 
     def chapters_from_page(self, page: bytes, manga: MangaCard = None):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         div = bs.find("div", {"id": "chapters"})
 
@@ -48,8 +49,18 @@ class TMOClient(MangaClient):
 
         return list(map(lambda x: MangaChapter(self, x[0], x[1], manga, []), zip(texts, links)))
 
+    def chapter_from_element(self, li, manga: MangaCard = None):
+        if not {'list-group-item', 'upload-link'} <= li.classes:
+            return None
+        a = li.find('.//a')
+        link = next((a for a in li.iter('a') if {'btn', 'btn-default', 'btn-sm'} <= a.classes), None)
+        if a is None or link is None or not has_ancestor(li, 'div', id='chapters'):
+            return None
+        text = a.text_content().strip().replace('\xa0', ' ')
+        return MangaChapter(self, text, link.get('href').strip(), manga, [])
+
     def updates_from_page(self, page: bytes):
-        bs = BeautifulSoup(page, "html.parser")
+        bs = html_soup(page)
 
         trs = bs.find_all("tr", {"class": "upload-file-row"})
 
@@ -57,18 +68,18 @@ class TMOClient(MangaClient):
 
         return urls
 
-    async def pictures_from_chapters(self, content: bytes, response=None):
-        bs = BeautifulSoup(content, "html.parser")
-
+    @staticmethod
+    def cascade_pages(bs) -> Optional[List[str]]:
         cascade = bs.find("a", {"title": "Cascada"})
 
-        if cascade:
-            url = cascade.get('href')
-            content = await self.get_url(url)
-            bs = BeautifulSoup(content, "html.parser")
-        else:
-            url = str(response.url)
+        # The paginated viewer links to the one that shows the whole chapter
+        return [cascade.get('href')] if cascade else None
 
+    def reader_pages(self, content: bytes, response=None):
+        return self.cascade_pages(html_soup(content))
+
+    @staticmethod
+    def viewer_pictures(bs):
         ul = bs.find('div', {'class': 'viewer-container container'})
 
         images = ul.find_all('img')
@@ -77,6 +88,26 @@ class TMOClient(MangaClient):
 
         return images_url
 
+    def pictures_from_reader_page(self, content: bytes):
+        return self.viewer_pictures(html_soup(content))
+
+    async def iter_pictures(self, content: bytes, response=None) -> AsyncIterable[str]:
+        # One parse of the page tells the viewer apart and gives its pictures
+        bs = html_soup(content)
+
+        pages = self.cascade_pages(bs)
+        if pages is None:
+            for picture in self.viewer_pictures(bs):
+                yield picture
+            return
+
+        async for pictures in self.resolve_reader_pages(pages):
+            for picture in pictures:
+                yield picture
+
+    async def pictures_from_chapters(self, content: bytes, response=None):
+        return [picture async for picture in self.iter_pictures(content, response)]
+
     async def search(self, query: str = "", page: int = 1) -> List[MangaCard]:
         query = quote_plus(query)
 
@@ -91,15 +122,13 @@ class TMOClient(MangaClient):
 
         content = await response.read()
 
-        return self.mangas_from_page(content)
+        return await self.parse(self.mangas_from_page, content)
 
     async def get_chapters(self, manga_card: MangaCard, page: int = 1) -> List[MangaChapter]:
 
-        request_url = f'{manga_card.url}'
-
-        content = await self.get_url(request_url)
+        chapters = await self.chapter_list(manga_card)
 
-        return self.chapters_from_page(content, manga_card)[(page - 1) * 20:page * 20]
+        return chapters[(page - 1) * 20:page * 20]
 
     async def iter_chapters(self, manga_url: str, manga_name) -> AsyncIterable[MangaChapter]:
         manga_card = MangaCard(self, manga_name, manga_url, '')
@@ -112,7 +141,7 @@ class TMOClient(MangaClient):
 
         content = await response.read()
 
-        for chapter in self.chapters_from_page(content, manga_card):
+        for chapter in self.iter_chapters_from_page(content, manga_card):
             yield chapter
 
     async def contains_url(self, url: str):
@@ -127,7 +156,7 @@ class TMOClient(MangaClient):
 
         content = await self.get_url(self.latest_uploads)
 
-        updates = self.updates_from_page(content)
+        updates = await self.parse(self.updates_from_page, content)
 
         s = set(updates)
 
@@ -0,0 +1,36 @@
+import asyncio
+import time
+from typing import Dict
+
+from config import broadcast_rate
+from tools.ratelimit import TokenBucket
+
+
+class FanoutPacer:
+    """
+    Spaces out the messages of a broadcast to stay under Telegram's limits, rate messages a second overall and
+    one message every chat_interval seconds in the same chat. A media group counts as one message per document.
+    """
+
+    def __init__(self, rate: float, chat_interval: float = 1.0):
+        self.bucket = TokenBucket(rate, max(int(rate), 1))
+        self.chat_interval = chat_interval
+        self.chat_next: Dict[int, float] = dict()
+
+    def _prune(self, now: float):
+        if len(self.chat_next) > 10000:
+            self.chat_next = {chat: ready for chat, ready in self.chat_next.items() if ready > now}
+
+    async def wait(self, chat_id: int, messages: int = 1):
+        now = time.monotonic()
+        self._prune(now)
+        # Slots in a chat are reserved before sleeping, so concurrent sends to it queue up one after another
+        start = max(now, self.chat_next.get(chat_id, 0))
+        self.chat_next[chat_id] = start + self.chat_interval * messages
+        if start > now:
+            await asyncio.sleep(start - now)
+        for _ in range(messages):
+            await self.bucket.acquire()
+
+
+broadcast_pacer = FanoutPacer(broadcast_rate)
@@ -0,0 +1,129 @@
+import asyncio
+import hashlib
+import json
+import os
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Mapping
+
+from config import http_cache_dir, http_cache_entries, http_cache_bytes, http_cache_max_page
+
+
+class HTTPCache:
+    """
+    Persistent ETag / Last-Modified store for GET responses.
+    Each url keeps a small json file with its validators next to the body it validates. Only HTML and JSON pages
+    up to max_page bytes are kept, the least recently used ones are dropped past max_entries or budget bytes.
+    """
+
+    cacheable_types = ('text/html', 'application/xhtml+xml', 'application/json')
+
+    def __init__(self, folder: str, max_entries: int, budget: int, max_page: int):
+        self.folder = Path(folder)
+        self.max_entries = max_entries
+        self.budget = budget
+        self.max_page = max_page
+        self.entries: Optional[OrderedDict] = None
+        self.size = 0
+        self._load_lock = asyncio.Lock()
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha1(url.encode()).hexdigest()
+
+    def body_path(self, entry: dict) -> Path:
+        return self.folder / f'{entry["key"]}.body'
+
+    def meta_path(self, entry: dict) -> Path:
+        return self.folder / f'{entry["key"]}.json'
+
+    def _load(self) -> OrderedDict:
+        os.makedirs(self.folder, exist_ok=True)
+        metas = sorted(self.folder.glob('*.json'), key=lambda path: path.stat().st_mtime)
+        entries = OrderedDict()
+        for path in metas:
+            try:
+                entry = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            entries[entry['key']] = entry
+        return entries
+
+    async def _ensure_loaded(self):
+        if self.entries is None:
+            async with self._load_lock:
+                if self.entries is None:
+                    self.entries = await asyncio.get_running_loop().run_in_executor(None, self._load)
+                    self.size = sum(entry['size'] for entry in self.entries.values())
+
+    async def get(self, url: str) -> Optional[dict]:
+        await self._ensure_loaded()
+        entry = self.entries.get(self.key(url))
+        if entry:
+            self.entries.move_to_end(entry['key'])
+        return entry
+
+    @staticmethod
+    def conditional_headers(entry: dict) -> dict:
+        headers = dict()
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def _write(self, entry: dict, body: bytes):
+        os.makedirs(self.folder, exist_ok=True)
+        body_path, meta_path = self.body_path(entry), self.meta_path(entry)
+        suffix = uuid.uuid4().hex
+        # Body first, so a meta file always points to a complete body
+        with open(f'{body_path}.{suffix}', 'wb') as f:
+            f.write(body)
+        os.replace(f'{body_path}.{suffix}', body_path)
+        with open(f'{meta_path}.{suffix}', 'w') as f:
+            f.write(json.dumps(entry))
+        os.replace(f'{meta_path}.{suffix}', meta_path)
+
+    def _remove(self, entry: dict):
+        for path in (self.meta_path(entry), self.body_path(entry)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def cacheable(self, headers: Mapping, body: bytes) -> bool:
+        if not headers.get('ETag') and not headers.get('Last-Modified'):
+            return False
+        content_type = (headers.get('Content-Type') or '').split(';')[0].strip().lower()
+        json_type = content_type.startswith('application/') and content_type.endswith('+json')
+        return (content_type in self.cacheable_types or json_type) and len(body) <= self.max_page
+
+    async def discard(self, url: str):
+        await self._ensure_loaded()
+        entry = self.entries.pop(self.key(url), None)
+        if entry:
+            self.size -= entry['size']
+            await asyncio.get_running_loop().run_in_executor(None, self._remove, entry)
+
+    async def put(self, url: str, headers: Mapping, body: bytes):
+        if not self.cacheable(headers, body):
+            # A stored version of the page would not be valid anymore
+            return await self.discard(url)
+        await self._ensure_loaded()
+        loop = asyncio.get_running_loop()
+        key = self.key(url)
+        entry = {'key': key, 'url': url, 'etag': headers.get('ETag'), 'last_modified': headers.get('Last-Modified'),
+                 'size': len(body)}
+        old = self.entries.get(key)
+        self.size += entry['size'] - (old['size'] if old else 0)
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        await loop.run_in_executor(None, self._write, entry, body)
+        while len(self.entries) > self.max_entries or self.size > self.budget:
+            _, oldest = self.entries.popitem(last=False)
+            self.size -= oldest['size']
+            await loop.run_in_executor(None, self._remove, oldest)
+
+
+http_cache = HTTPCache(http_cache_dir, http_cache_entries, http_cache_bytes, http_cache_max_page)
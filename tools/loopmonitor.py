@@ -0,0 +1,55 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Tuple
+
+from loguru import logger
+
+
+class LoopMonitor:
+    """
+    Measures how long the event loop is kept from running its callbacks.
+
+    A task asks to wake up every interval seconds, anything it wakes up late is time the loop spent
+    blocked by some synchronous code. Stalls from the last window seconds are kept for the stats.
+    """
+
+    def __init__(self, interval: float = 0.1, window: float = 60, warn: float = 0.25):
+        self.interval = interval
+        self.window = window
+        self.warn = warn
+        self.stalls: Deque[Tuple[float, float]] = deque()
+        self.total_blocked = 0.0
+        self.max_blocked = 0.0
+
+    def record(self, now: float, lag: float):
+        self.stalls.append((now, lag))
+        self.total_blocked += lag
+        self.max_blocked = max(self.max_blocked, lag)
+        while self.stalls and self.stalls[0][0] < now - self.window:
+            self.stalls.popleft()
+        if lag >= self.warn:
+            logger.warning(f'Event loop was blocked for {lag * 1000:.0f} ms')
+
+    def stats(self) -> dict:
+        recent = [lag for _, lag in self.stalls]
+        return {
+            'blocked_ms': sum(recent) * 1000,
+            'max_ms': max(recent, default=0) * 1000,
+            'window_s': self.window,
+            'total_blocked_s': self.total_blocked,
+            'max_blocked_ms': self.max_blocked * 1000,
+        }
+
+    async def run(self):
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = now - start - self.interval
+            # A couple of milliseconds late is just scheduling noise
+            if lag > 0.005:
+                self.record(now, lag)
+
+
+loop_monitor = LoopMonitor()
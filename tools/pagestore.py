@@ -0,0 +1,137 @@
+import asyncio
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+from config import page_store_dir, page_store_bytes, page_store_days
+
+
+class PageStore:
+    """
+    Content addressed store for downloaded pages that survives restarts.
+
+    Blobs are named by the sha256 of their content, and an sqlite index maps every page url to its blob.
+    Chapter folders are filled with hard links to the blobs, so building a chapter twice never hits the
+    origin twice. The janitor keeps the store under its byte budget by evicting the least recently used
+    blobs and the ones not used for max_age seconds.
+    """
+
+    def __init__(self, folder: str, budget: int, max_age: float):
+        self.folder = Path(folder)
+        self.budget = budget
+        self.max_age = max_age
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(self.folder / 'blobs', exist_ok=True)
+            db = sqlite3.connect(self.folder / 'index.sqlite', check_same_thread=False)
+            db.execute('CREATE TABLE IF NOT EXISTS blobs '
+                       '(digest TEXT PRIMARY KEY, size INTEGER NOT NULL, last_access REAL NOT NULL)')
+            db.execute('CREATE INDEX IF NOT EXISTS blobs_last_access ON blobs (last_access)')
+            db.execute('CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, digest TEXT NOT NULL)')
+            db.execute('CREATE INDEX IF NOT EXISTS pages_digest ON pages (digest)')
+            db.commit()
+            self._db = db
+        return self._db
+
+    def blob_path(self, digest: str) -> Path:
+        return self.folder / 'blobs' / digest[:2] / digest
+
+    @staticmethod
+    def _link(source: Path, dest: Path):
+        os.makedirs(dest.parent, exist_ok=True)
+        temp = dest.parent / f'.{uuid.uuid4().hex}'
+        try:
+            os.link(source, temp)
+        except OSError:
+            shutil.copyfile(source, temp)
+        os.replace(temp, dest)
+
+    def _fetch(self, url: str, dest: Path) -> bool:
+        with self._lock:
+            db = self._connect()
+            row = db.execute('SELECT digest FROM pages WHERE url = ?', (url,)).fetchone()
+            if not row:
+                return False
+            digest = row[0]
+            try:
+                self._link(self.blob_path(digest), dest)
+            except FileNotFoundError:
+                db.execute('DELETE FROM pages WHERE digest = ?', (digest,))
+                db.execute('DELETE FROM blobs WHERE digest = ?', (digest,))
+                db.commit()
+                return False
+            db.execute('UPDATE blobs SET last_access = ? WHERE digest = ?', (time.time(), digest))
+            db.commit()
+            return True
+
+    def _add(self, url: str, path: Path):
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        blob = self.blob_path(digest)
+        with self._lock:
+            db = self._connect()
+            if not blob.exists():
+                self._link(path, blob)
+            db.execute('INSERT OR REPLACE INTO blobs (digest, size, last_access) VALUES (?, ?, ?)',
+                       (digest, blob.stat().st_size, time.time()))
+            db.execute('INSERT OR REPLACE INTO pages (url, digest) VALUES (?, ?)', (url, digest))
+            db.commit()
+
+    def _evict(self) -> int:
+        with self._lock:
+            db = self._connect()
+            expired = [row[0] for row in db.execute('SELECT digest FROM blobs WHERE last_access < ?',
+                                                    (time.time() - self.max_age,))]
+            total = db.execute('SELECT COALESCE(SUM(size), 0) FROM blobs WHERE last_access >= ?',
+                               (time.time() - self.max_age,)).fetchone()[0]
+            over_budget = []
+            if total > self.budget:
+                for digest, size in db.execute('SELECT digest, size FROM blobs WHERE last_access >= ? '
+                                               'ORDER BY last_access', (time.time() - self.max_age,)):
+                    if total <= self.budget:
+                        break
+                    over_budget.append(digest)
+                    total -= size
+            for digest in expired + over_budget:
+                try:
+                    os.remove(self.blob_path(digest))
+                except FileNotFoundError:
+                    pass
+                db.execute('DELETE FROM pages WHERE digest = ?', (digest,))
+                db.execute('DELETE FROM blobs WHERE digest = ?', (digest,))
+            db.commit()
+            return len(expired) + len(over_budget)
+
+    async def fetch(self, url: str, dest: Path) -> bool:
+        """Places the stored page for url at dest, returns False if the page is not stored"""
+        return await asyncio.get_running_loop().run_in_executor(None, self._fetch, url, dest)
+
+    async def add(self, url: str, path: Path):
+        await asyncio.get_running_loop().run_in_executor(None, self._add, url, path)
+
+    async def janitor(self, interval: float = 10 * 60):
+        while True:
+            try:
+                evicted = await asyncio.get_running_loop().run_in_executor(None, self._evict)
+                if evicted:
+                    logger.debug(f'Page store evicted {evicted} pages')
+            except Exception as e:
+                logger.exception(f'An exception occurred cleaning the page store: {e}')
+            await asyncio.sleep(interval)
+
+
+page_store = PageStore(page_store_dir, page_store_bytes, page_store_days * 24 * 60 * 60)
@@ -0,0 +1,63 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional, TypeVar
+
+from loguru import logger
+
+from config import parse_processes, parse_threshold
+
+T = TypeVar("T")
+
+
+class ParsePool:
+    """
+    Runs parsers of big pages in worker processes so they do not block the event loop.
+
+    Pages smaller than threshold bytes are parsed inline, shipping them to another process costs more
+    than parsing them. The workers are forked from the bot process, call start before the event loop
+    starts any thread so they come up in a clean state.
+    """
+
+    def __init__(self, processes: int, threshold: int):
+        self.processes = processes
+        self.threshold = threshold
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context('fork'))
+        return self._executor
+
+    def start(self):
+        if self.processes > 0:
+            # With fork every worker is created on the first submit
+            self._get_executor().submit(int).result()
+
+    def offload(self, content) -> bool:
+        return self.processes > 0 and isinstance(content, (bytes, str)) and len(content) >= self.threshold
+
+    async def run(self, function: Callable[..., T], content, *args) -> T:
+        if not self.offload(content):
+            return function(content, *args)
+        return await self._run_in_worker(function, content, *args)
+
+    async def run_heavy(self, function: Callable[..., T], content, *args) -> T:
+        """For work that is slow whatever the size, it goes to a worker or to a thread when there are no workers"""
+        if self.processes <= 0:
+            return await asyncio.get_running_loop().run_in_executor(None, function, content, *args)
+        return await self._run_in_worker(function, content, *args)
+
+    async def _run_in_worker(self, function: Callable[..., T], content, *args) -> T:
+        executor = self._get_executor()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, function, content, *args)
+        except BrokenProcessPool:
+            logger.exception('The parse pool broke, parsing in a thread until it is replaced')
+            if self._executor is executor:
+                self._executor = None
+            return await asyncio.get_running_loop().run_in_executor(None, function, content, *args)
+
+
+parse_pool = ParsePool(parse_processes, parse_threshold)
@@ -0,0 +1,142 @@
+import heapq
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from config import updates_min_interval, updates_max_interval
+
+
+@dataclass
+class MangaSchedule:
+    url: str
+    next_check: float = 0
+    last_check: float = 0
+    # Wait between checks of a manga that is late or has no known cadence, grows with every miss
+    backoff: float = 0
+    # Estimated times new chapters came out, oldest first
+    releases: List[float] = field(default_factory=list)
+
+    def cadence(self) -> Optional[float]:
+        if len(self.releases) < 2:
+            return None
+        return statistics.median(b - a for a, b in zip(self.releases, self.releases[1:]))
+
+    def to_dict(self) -> dict:
+        return {"_id": self.url, "next_check": self.next_check, "last_check": self.last_check, "backoff": self.backoff,
+                "releases": self.releases}
+
+    @classmethod
+    def from_dict(cls, doc: dict) -> "MangaSchedule":
+        return cls(doc["_id"], doc.get("next_check", 0), doc.get("last_check", 0), doc.get("backoff", 0),
+                   list(doc.get("releases", [])))
+
+
+class PollScheduler:
+    """
+    Decides when every manga is checked for new chapters next, from the times its chapters were found before.
+
+    A manga with a known cadence sleeps until shortly before its next expected release and is then checked every
+    min_interval until the release shows up or the boost window is over. Mangas that are late, or whose cadence is
+    still unknown, are checked less and less often, never more than max_interval apart.
+    Next checks are kept in a heap so the updater only looks at the mangas that are due.
+    """
+
+    def __init__(self, min_interval: float, max_interval: float, history: int = 10, growth: float = 1.5,
+                 boost_window: float = 4 * 3600):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.history = history
+        self.growth = growth
+        self.boost_window = boost_window
+        self.schedules: Dict[str, MangaSchedule] = dict()
+        self.heap: List[Tuple[float, str]] = []
+        self.loaded = False
+
+    def load(self, docs: Iterable[dict]):
+        self.schedules = {doc["_id"]: MangaSchedule.from_dict(doc) for doc in docs}
+        self.heap = [(schedule.next_check, url) for url, schedule in self.schedules.items()]
+        heapq.heapify(self.heap)
+        self.loaded = True
+
+    def _push(self, schedule: MangaSchedule):
+        self.schedules[schedule.url] = schedule
+        heapq.heappush(self.heap, (schedule.next_check, schedule.url))
+
+    def window(self, cadence: float) -> float:
+        return min(max(cadence / 8, self.min_interval), self.boost_window)
+
+    def interval(self, schedule: MangaSchedule, now: float) -> float:
+        cadence = schedule.cadence()
+        if cadence:
+            window = self.window(cadence)
+            expected = schedule.releases[-1] + cadence
+            if now < expected - window:
+                return min(max(expected - window - now, self.min_interval), self.max_interval)
+            if now <= expected + window:
+                return self.min_interval
+        return schedule.backoff or self.min_interval
+
+    def pop_due(self, now: float = None) -> Set[str]:
+        """Takes out the urls whose check time has come, each has to be recorded, postponed or forgotten after"""
+        now = time.time() if now is None else now
+        due = set()
+        while self.heap and self.heap[0][0] <= now:
+            next_check, url = heapq.heappop(self.heap)
+            schedule = self.schedules.get(url)
+            # Entries left behind by a later reschedule are skipped
+            if schedule is not None and schedule.next_check == next_check:
+                due.add(url)
+        return due
+
+    def is_new(self, url: str) -> bool:
+        """Mangas that were never checked are due right away"""
+        return url not in self.schedules
+
+    def forget(self, url: str):
+        self.schedules.pop(url, None)
+
+    def record(self, url: str, released: bool, now: float = None) -> MangaSchedule:
+        """Schedules the next check of a manga that was just checked, released tells if it had new chapters"""
+        now = time.time() if now is None else now
+        schedule = self.schedules.get(url) or MangaSchedule(url)
+        cadence = schedule.cadence()
+        if released:
+            # The chapter came out somewhere between the previous check and this one
+            released_at = (schedule.last_check + now) / 2 if schedule.last_check else now
+            schedule.releases = (schedule.releases + [released_at])[-self.history:]
+            schedule.backoff = self.min_interval
+        elif not cadence or now > schedule.releases[-1] + cadence + self.window(cadence):
+            schedule.backoff = min(max(schedule.backoff * self.growth, self.min_interval), self.max_interval)
+        schedule.last_check = now
+        schedule.next_check = now + self.interval(schedule, now)
+        self._push(schedule)
+        return schedule
+
+    def postpone(self, url: str, now: float = None) -> MangaSchedule:
+        """Checks a manga again after min_interval, for mangas that were due but could not be checked"""
+        now = time.time() if now is None else now
+        schedule = self.schedules.get(url) or MangaSchedule(url)
+        schedule.next_check = now + self.min_interval
+        self._push(schedule)
+        return schedule
+
+    def postpone_unscheduled(self, urls: Iterable[str], now: float = None):
+        """Postpones the urls out of urls that were taken by pop_due and not recorded or postponed since"""
+        now = time.time() if now is None else now
+        for url in urls:
+            schedule = self.schedules.get(url)
+            if schedule is None or schedule.next_check <= now:
+                self.postpone(url, now)
+
+    def next_check(self) -> Optional[float]:
+        while self.heap:
+            next_check, url = self.heap[0]
+            schedule = self.schedules.get(url)
+            if schedule is not None and schedule.next_check == next_check:
+                return next_check
+            heapq.heappop(self.heap)
+        return None
+
+
+poll_scheduler = PollScheduler(updates_min_interval, updates_max_interval)
@@ -0,0 +1,79 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict
+from urllib.parse import urlparse
+
+from config import host_rate, host_burst, host_concurrency
+
+
+@dataclass
+class RateLimit:
+    rate: float = host_rate
+    burst: int = host_burst
+    connections: int = host_concurrency
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        # The lock makes waiters take tokens in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostLimiter:
+    def __init__(self, limit: RateLimit):
+        self.limit = limit
+        self.bucket = TokenBucket(limit.rate, limit.burst)
+        self.connections = asyncio.Semaphore(limit.connections)
+
+    async def __aenter__(self):
+        await self.connections.acquire()
+        try:
+            await self.bucket.acquire()
+        except BaseException:
+            self.connections.release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.connections.release()
+
+
+class RateLimiter:
+    """
+    Request budget per host shared by every plugin session.
+    Hosts without an explicit limit get the default one.
+    """
+
+    def __init__(self, default: RateLimit = None):
+        self.default = default or RateLimit()
+        self.limits: Dict[str, RateLimit] = dict()
+        self.hosts: Dict[str, HostLimiter] = dict()
+
+    def configure(self, host: str, limit: RateLimit):
+        self.limits[host] = limit
+        self.hosts.pop(host, None)
+
+    def __call__(self, url: str) -> HostLimiter:
+        host = urlparse(url).netloc
+        if host not in self.hosts:
+            self.hosts[host] = HostLimiter(self.limits.get(host, self.default))
+        return self.hosts[host]
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,95 @@
+import random
+import time
+from typing import Dict
+from urllib.parse import urlparse
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f'{name} is unavailable, retrying in {int(retry_in)} seconds')
+        self.name = name
+        self.retry_in = retry_in
+
+
+def backoff(attempt: int, base: float = 0.5, cap: float = 30) -> float:
+    # Full jitter, so clients that failed together do not retry together
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class RetryBudget:
+    """
+    Every request earns a fraction of a retry and every retry spends a whole one,
+    so retries stay a bounded share of the traffic sent to a site.
+    """
+
+    def __init__(self, ratio: float = 0.2, capacity: float = 10):
+        self.ratio = ratio
+        self.capacity = capacity
+        self.tokens = capacity
+
+    def deposit(self):
+        self.tokens = min(self.capacity, self.tokens + self.ratio)
+
+    def available(self) -> bool:
+        return self.tokens >= 1
+
+    def withdraw(self):
+        self.tokens -= 1
+
+
+class CircuitBreaker:
+    """
+    Opens after threshold consecutive failures and rejects requests for reset_timeout seconds.
+    After that requests go through again, the first success closes it and a failure opens it again.
+    """
+
+    def __init__(self, name: str, threshold: int = 5, reset_timeout: float = 5 * 60):
+        self.name = name
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def retry_in(self) -> float:
+        if self.opened_at is None:
+            return 0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    @property
+    def is_open(self) -> bool:
+        return self.retry_in > 0
+
+    def check(self):
+        if self.is_open:
+            raise CircuitOpenError(self.name, self.retry_in)
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+
+
+class HostBreakers:
+    """
+    Circuit breaker per host shared by every plugin session, so a failing image host does not stop the requests
+    sent to the site, and the plugins of a site in several languages share one.
+    """
+
+    def __init__(self, threshold: int = 5, reset_timeout: float = 5 * 60):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.hosts: Dict[str, CircuitBreaker] = dict()
+
+    def __call__(self, url: str) -> CircuitBreaker:
+        host = urlparse(url).netloc
+        if host not in self.hosts:
+            self.hosts[host] = CircuitBreaker(host, self.threshold, self.reset_timeout)
+        return self.hosts[host]
+
+
+host_breakers = HostBreakers()
@@ -0,0 +1,23 @@
+import asyncio
+from typing import Dict, Hashable, Callable, Awaitable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller runs the call and
+    everyone who arrives while it is in flight awaits the same result or exception.
+    """
+
+    def __init__(self):
+        self.calls: Dict[Hashable, asyncio.Task] = dict()
+
+    async def do(self, key: Hashable, function: Callable[[], Awaitable[T]]) -> T:
+        task = self.calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(function())
+            self.calls[key] = task
+            task.add_done_callback(lambda _: self.calls.pop(key, None))
+        # A caller that gets cancelled must not cancel the call for the rest
+        return await asyncio.shield(task)
@@ -6,6 +6,7 @@ class LanguageSingleton(type):
         if lang:
             if (cls, lang) not in cls._instances:
                 cls._instances[(cls, lang)] = super(LanguageSingleton, cls).__call__(*args, **kwargs)
+                cls._instances[(cls, lang)].singleton_language = lang
             return cls._instances[(cls, lang)]
         if cls not in cls._instances:
             cls._instances[cls] = super(LanguageSingleton, cls).__call__(*args, **kwargs)
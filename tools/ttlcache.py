@@ -0,0 +1,52 @@
+import time
+from collections import OrderedDict
+from typing import Hashable, Callable, Awaitable, TypeVar, Any
+
+from .singleflight import SingleFlight
+
+T = TypeVar("T")
+
+_missing = object()
+
+
+class TTLCache:
+    """Keeps values for ttl seconds, dropping the least recently used ones past maxsize"""
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.data: OrderedDict[Hashable, tuple] = OrderedDict()
+        self.inflight = SingleFlight()
+
+    def get(self, key: Hashable, default: Any = None):
+        item = self.data.get(key)
+        if item is None:
+            return default
+        expires, value = item
+        if expires < time.monotonic():
+            del self.data[key]
+            return default
+        self.data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        self.data[key] = (time.monotonic() + self.ttl, value)
+        self.data.move_to_end(key)
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        self.data.pop(key, None)
+
+    async def get_or_set(self, key: Hashable, function: Callable[[], Awaitable[T]]) -> T:
+        value = self.get(key, _missing)
+        if value is not _missing:
+            return value
+
+        async def fill():
+            result = await function()
+            self.set(key, result)
+            return result
+
+        # Concurrent misses for the same key share one call
+        return await self.inflight.do(key, fill)